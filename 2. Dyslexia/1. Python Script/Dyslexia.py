@@ -1,29 +1,75 @@
-import random
-import nltk
+import atexit
+import hashlib
+import os
+import sys
+import threading
 import time
-from tqdm import tqdm
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from fuzzywuzzy import fuzz
-from nltk.corpus import words as nltk_words
-from nltk.tokenize import word_tokenize
+from collections import Counter
+from functools import lru_cache, partial
+
+# Shared helpers live in "5. Common" at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "5. Common"))
+from lazy_import import lazy_import
+from report_renderer import Report, default_service
+
+# Heavy dependencies are imported on first use, so the first prompt appears without waiting for them
+tqdm = lazy_import("tqdm")
+fuzz = lazy_import("fuzzywuzzy.fuzz")
+column_table = lazy_import("column_table")
+
+from vocab_store import load_vocab
+from token_alignment import align_tokens
+from confusion_matcher import ConfusionMatcher, load_word_confusions
+from token_cache import TokenScoreCache
+from sentence_bank import SentenceBank
+import instrumentation
+from instrumentation import instrument
 
 # Constants
 SIMILARITY_THRESHOLD = 50
 DYSLEXIA_SCORE_THRESHOLD = 3.5
-
-# Ensure necessary NLTK resources are available
+SENTENCES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sentences.txt")
+
+# Progress bars are shown only in interactive runs unless DYSLEXIA_PROGRESS says otherwise
+SHOW_PROGRESS = os.environ.get("DYSLEXIA_PROGRESS", "1" if sys.stderr.isatty() else "0").lower() in ("1", "true", "yes", "on")
+
+# With DYSLEXIA_METRICS enabled, stage metrics are written here on exit (.prom for Prometheus text, else JSON)
+METRICS_PATH = os.environ.get("DYSLEXIA_METRICS_FILE")
+
+# Every scored response, with its rule hits, is appended to this column table next to the script;
+# DYSLEXIA_RESULTS_TABLE moves it, or disables it when set empty
+RESULTS_TABLE_PATH = os.environ.get(
+    "DYSLEXIA_RESULTS_TABLE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "dyslexia_results"))
+
+# Rules a token score is made of, see token_rule_scores()
+RULE_FIELDS = ("unknown_word", "letter_confusion", "word_confusion", "transposition", "reversal")
+# Rule scores of a token copied correctly from its target word
+CLEAN_TOKEN_RULES = (0.0,) * len(RULE_FIELDS)
+# Columns of the results table, one row per scored response
+RESULT_COLUMNS = (("recorded_at", "<f8"), ("student_id", "category"), ("name", "category"), ("sentence", "str"),
+                  ("response", "str"), ("score", "<f8"), ("tokens", "<i4"), ("clean_tokens", "<i4"))
+RESULT_COLUMNS += tuple((rule, "<f8") for rule in RULE_FIELDS)
+
+# Ensure necessary NLTK resources are available, downloading only the ones that are missing
 def ensure_nltk_resources():
-    nltk.download('punkt')
-    nltk.download('words')
+    import nltk
+    try:
+        nltk.data.find('tokenizers/punkt')
+    except LookupError:
+        nltk.download('punkt')
 
-# Initialize NLTK resources
-ensure_nltk_resources()
+# NLTK is imported, and its resources checked, the first time text is tokenized rather than at startup
+@lru_cache(maxsize=None)
+def load_word_tokenizer():
+    ensure_nltk_resources()
+    from nltk.tokenize import word_tokenize
+    return word_tokenize
 
-# Create a set of English words from NLTK
-english_vocab = set(w.lower() for w in nltk_words.words())
+# Memory-mapped English vocabulary (see vocab_store.py); supports `word in english_vocab` like a set
+english_vocab = load_vocab()
 
-# Define dyslexic letter and word confusions as constants
+# Define dyslexic letter confusions as constants
 DYSLEXIC_LETTER_CONFUSIONS = [
     ('b', 'd'), ('p', 'q'), ('m', 'w'), ('n', 'u'), ('n', 'r'),
     ('i', 'j'), ('a', 'e'), ('s', 'z'), ('f', 't'), ('c', 'k'),
@@ -31,26 +77,196 @@ DYSLEXIC_LETTER_CONFUSIONS = [
     ('d', 't'), ('o', 'e'), ('a', 'o'), ('u', 'v'), ('m', 'n')
 ]
 
-DYSLEXIC_WORD_CONFUSIONS = [
-    ('was', 'saw'), ('there', 'their'), ('here', 'hear'),
-    ('you', 'your'), ('where', 'wear'), ('to', 'too', 'two'),
-    ('here', 'here'), ('their', 'there'), ('its', 'it\'s'),
-    ('to', 'two', 'too'), ('where', 'were'), ('new', 'knew'),
-    ('there', 'their', 'they\'re'), ('your', 'you\'re'), ('its', 'it\'s'),
-    ('to', 'too', 'two'), ('break', 'brake'), ('bare', 'bear'), ('peace', 'piece'),
-    ('where', 'wear'), ('here', 'hear'), ('right', 'write'), ('flower', 'flour'),
-    ('buy', 'by', 'bye'), ('no', 'know'), ('for', ' four'), ('sun', 'son'),
-    ('allowed', 'aloud'), ('hour', 'our'), ('blew', 'blue'), ('sew', 'sow'),
-    ('be', 'bee'), ('one', 'won'), ('here', 'hair'), ('you', 'ewe'),
-    ('toe', 'tow'), ('flower', 'flour'), ('threw', 'through'), ('role', 'roll'),
-    ('flower', 'flour'), ('peace', 'piece'), ('mail', 'male'), ('tail', 'tale')
-]
+# Word confusion sets are loaded from a data file so language or curriculum specific sets can be swapped in
+WORD_CONFUSIONS_PATH = os.environ.get(
+    "DYSLEXIA_WORD_CONFUSIONS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "word_confusions.txt"))
+DYSLEXIC_WORD_CONFUSIONS = load_word_confusions(WORD_CONFUSIONS_PATH)
+
+# Letter -> bit used to build per-token character masks
+LETTER_BITS = {chr(ord('a') + i): 1 << i for i in range(26)}
+
+# Build a bitmask of the a-z letters present in a token
+def char_mask(text):
+    mask = 0
+    for char in set(text):
+        mask |= LETTER_BITS.get(char, 0)
+    return mask
+
+# Compile the letter confusions into (pair mask, weight) rules; repeated pairs keep their combined weight
+def compile_letter_rules(letter_confusions):
+    counts = Counter(char_mask(first + second) for first, second in letter_confusions)
+    return tuple((pair_mask, 3.0 * count) for pair_mask, count in counts.items())
+
+# Compile the word confusions into a single Aho-Corasick matcher
+# Sets that contain a non-alphanumeric word are dropped since cleaned tokens can never contain them
+def compile_word_rules(word_confusions):
+    return ConfusionMatcher(
+        [confusion for confusion in word_confusions if all(conf_word.isalnum() for conf_word in confusion)],
+        weight=4.0)
+
+LETTER_CONFUSION_RULES = compile_letter_rules(DYSLEXIC_LETTER_CONFUSIONS)
+WORD_CONFUSION_MATCHER = compile_word_rules(DYSLEXIC_WORD_CONFUSIONS)
+
+# Fingerprint of everything a token score depends on; cached scores from other versions are never reused
+def compute_ruleset_version():
+    vocab_stat = os.stat(english_vocab.path)
+    fingerprint = repr((RULE_FIELDS, DYSLEXIC_LETTER_CONFUSIONS, DYSLEXIC_WORD_CONFUSIONS, len(english_vocab),
+                        vocab_stat.st_size, vocab_stat.st_mtime_ns))
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+RULESET_VERSION = compute_ruleset_version()
+
+# Memoized per-token rule scores; size and optional on-disk persistence are set through the environment
+token_score_cache = TokenScoreCache(
+    maxsize=int(os.environ.get("DYSLEXIA_TOKEN_CACHE_SIZE", 100000)),
+    path=os.environ.get("DYSLEXIA_TOKEN_CACHE_PATH"))
+if token_score_cache.path:
+    token_score_cache.load(RULESET_VERSION)
+    atexit.register(token_score_cache.save, RULESET_VERSION)
 
 # Tokenize and clean the text using NLTK's word_tokenize
+@instrument("tokenize")
 def tokenize_and_clean_text(text):
-    words = word_tokenize(text.lower())
+    words = load_word_tokenizer()(text.lower())
     return [word for word in words if word.isalnum()]
 
+# Tokenize a target sentence once and reuse it for every response scored against it
+@lru_cache(maxsize=1024)
+def tokenize_sentence(sentence):
+    return tuple(tokenize_and_clean_text(sentence))
+
+# Score of all letter-confusion pairs present in a token, memoized on its character mask
+@lru_cache(maxsize=None)
+def letter_confusion_score(mask):
+    score = 0
+    for pair_mask, weight in LETTER_CONFUSION_RULES:
+        if mask & pair_mask == pair_mask:
+            score += weight
+    return score
+
+# Check whether swapping two adjacent letters of word_token gives target_word
+def is_adjacent_transposition(word_token, target_word):
+    diffs = [i for i, (a, b) in enumerate(zip(word_token, target_word)) if a != b]
+    if not diffs:
+        # Swapping a doubled letter leaves the word unchanged
+        return any(word_token[i] == word_token[i + 1] for i in range(len(word_token) - 1))
+    if len(diffs) != 2 or diffs[1] != diffs[0] + 1:
+        return False
+    i, j = diffs
+    return word_token[i] == target_word[j] and word_token[j] == target_word[i]
+
+# Rule scores (in RULE_FIELDS order) of a single cleaned token against a target word, using the cache
+def score_token_rules(word_token, target_word):
+    key = (word_token, target_word, RULESET_VERSION)
+    rule_scores = token_score_cache.get(key)
+    if rule_scores is None:
+        instrumentation.increment("token_cache_misses")
+        rule_scores = tuple(token_rule_scores(word_token, target_word).values())
+        token_score_cache.put(key, rule_scores)
+    else:
+        instrumentation.increment("token_cache_hits")
+    return rule_scores
+
+# Calculate the dyslexia score for a single cleaned token against a target word, using the cache
+def score_token(word_token, target_word):
+    return sum(score_token_rules(word_token, target_word))
+
+# Check whether a token is missing from the English vocabulary
+@instrument("vocab_lookup")
+def is_unknown_word(word_token):
+    return word_token not in english_vocab
+
+# Letter and word confusion scores of a token
+@instrument("confusion_rules")
+def confusion_scores(word_token):
+    return letter_confusion_score(char_mask(word_token)), WORD_CONFUSION_MATCHER.score(word_token)
+
+# Check whether a token is the target word with two adjacent letters swapped
+def is_transposition_of(word_token, target_word):
+    token_length = len(word_token)
+    return token_length == len(target_word) and token_length > 1 and is_adjacent_transposition(word_token, target_word)
+
+# Contribution of each rule (RULE_FIELDS) to a token's score against a target word; a token with
+# no target word is only checked against the vocabulary and confusion rules
+@instrument("token_score")
+def token_rule_scores(word_token, target_word):
+    letter_confusion, word_confusion = confusion_scores(word_token)
+    return {
+        "unknown_word": 3.0 if is_unknown_word(word_token) else 0.0,
+        "letter_confusion": float(letter_confusion),
+        "word_confusion": float(word_confusion),
+        "transposition": 3.0 if target_word is not None and is_transposition_of(word_token, target_word) else 0.0,
+        "reversal": 3.0 if target_word is not None and word_token[::-1] == target_word else 0.0,
+    }
+
+# Calculate the dyslexia score for already tokenized words against the target sentence tokens
+def score_tokens(word_tokens, sentence_tokens):
+    if list(word_tokens) == list(sentence_tokens):
+        return 0
+
+    target_word = sentence_tokens[0] if sentence_tokens else None
+    dyslexia_score = 0
+    for word_token in word_tokens:
+        token_dyslexia_score = score_token(word_token, target_word)
+        dyslexia_score += token_dyslexia_score
+
+        if token_dyslexia_score == 0:
+            dyslexia_score -= 0.3
+
+    return dyslexia_score
+
+# Rule scores of every response token against the target word it aligns to
+# A token identical to its aligned target word was copied correctly and counts as clean; inserted
+# tokens with no target word are only checked against the vocabulary and confusion rules
+def aligned_token_rules(word_tokens, sentence_tokens):
+    token_rules = []
+    for response_index, target_index in align_tokens(word_tokens, sentence_tokens):
+        if response_index is None:
+            continue  # Word missing from the response
+
+        word_token = word_tokens[response_index]
+        target_word = sentence_tokens[target_index] if target_index is not None else None
+        token_rules.append(CLEAN_TOKEN_RULES if word_token == target_word else score_token_rules(word_token, target_word))
+    return token_rules
+
+# Score of each aligned token; clean tokens count as -0.3
+def token_scores_from_rules(token_rules):
+    return [sum(rule_scores) or -0.3 for rule_scores in token_rules]
+
+# Score every response token against the target word it aligns to
+def score_aligned_tokens(word_tokens, sentence_tokens):
+    return token_scores_from_rules(aligned_token_rules(word_tokens, sentence_tokens))
+
+# Rule hits of a response: per-rule score totals over its aligned tokens, the number of tokens
+# scored and of clean ones, and the score, which equals dyslexia_analysis() (and is timed as the
+# same stage)
+@instrument("analysis")
+def score_breakdown(user_text, random_sentence, sentence_tokens=None):
+    breakdown = dict.fromkeys(RULE_FIELDS, 0.0)
+    breakdown.update(tokens=0, clean_tokens=0, score=0)
+    if is_exact_match(user_text, random_sentence):
+        return breakdown
+
+    if sentence_tokens is None:
+        sentence_tokens = tokenize_sentence(random_sentence)
+    token_rules = aligned_token_rules(tokenize_and_clean_text(user_text), sentence_tokens)
+    token_scores = token_scores_from_rules(token_rules)
+    instrumentation.increment("tokens_scored", len(token_scores))
+    for rule, rule_scores in zip(RULE_FIELDS, zip(*token_rules)):
+        breakdown[rule] = sum(rule_scores)
+    breakdown["tokens"] = len(token_scores)
+    breakdown["clean_tokens"] = sum(1 for rule_scores in token_rules if not sum(rule_scores))
+    breakdown["score"] = average_token_score(token_scores)
+    return breakdown
+
+# Average of the token scores of a response, rounded as reported; a response without any words
+# (empty or only punctuation) has nothing to score and is rejected
+def average_token_score(token_scores):
+    if not token_scores:
+        raise ValueError("The response contains no words to score.")
+    return round(sum(token_scores) / len(token_scores), 3)
+
 # Check if the user input sentence is exactly the same as the random sentence
 def is_exact_match(user_text, random_sentence):
     user_text_lower = user_text.lower().strip()
@@ -62,193 +278,118 @@ def are_strings_similar(str1, str2, threshold):
     similarity_score = fuzz.ratio(str1.lower(), str2.lower())
     return similarity_score >= threshold
 
-# Get a random sentence from a file
+# Get the sentences from a file, without trailing newlines or blank lines
 def read_sentences_from_file(filename):
+    bank = load_sentence_bank(filename)
+    return bank.sentences if bank else []
+
+# Load a pre-tokenized sentence bank once, reusing its binary cache when the file is unchanged
+def load_sentence_bank(filename=SENTENCES_PATH):
     try:
-        with open(filename, "r", encoding="utf-8") as file:
-            sentences = file.readlines()
-        return sentences
+        return SentenceBank.load(filename, tokenize_and_clean_text)
     except FileNotFoundError:
         print(f"File '{filename}' not found.")
-        return []
+        return None
     except Exception as e:
         print(f"An error occurred while reading '{filename}': {e}")
-        return []
+        return None
 
 # Calculate the dyslexia score for a single word
+@instrument("word_score")
 def calculate_word_dyslexia_score(word, random_sentence):
-    word_tokens = tokenize_and_clean_text(word)
-    sentence_tokens = tokenize_and_clean_text(random_sentence)
-    dyslexia_score = 0
-
-    if word_tokens == sentence_tokens:
-        dyslexia_score -= 1
-        return 0
-
-    for word_token in word_tokens:
-        token_dyslexia_score = 0
-
-        if word_token not in english_vocab:
-            token_dyslexia_score += 3.0
-
-        for confusion in DYSLEXIC_LETTER_CONFUSIONS:
-            if confusion[0] in word_token and confusion[1] in word_token:
-                token_dyslexia_score += 3.0
-
-        for confusion in DYSLEXIC_WORD_CONFUSIONS:
-            if all(conf_word in word_token for conf_word in confusion):
-                token_dyslexia_score += 4.0
+    return score_tokens(tokenize_and_clean_text(word), tokenize_sentence(random_sentence))
 
-        if len(word_token) == len(sentence_tokens[0]):
-            transpositions = [(word_token[:i] + word_token[i + 1] + word_token[i] + word_token[i + 2:]) for i in range(len(word_token) - 1)]
-            if sentence_tokens[0] in transpositions:
-                token_dyslexia_score += 3.0
 
-        if word_token[::-1] == sentence_tokens[0]:
-            token_dyslexia_score += 3.0
-
-        dyslexia_score += token_dyslexia_score
-
-        if token_dyslexia_score == 0:
-            dyslexia_score -= 0.3
-
-    return dyslexia_score
+# Perform dyslexia analysis for a user-entered sentence by aligning it to the target sentence
+# sentence_tokens can be passed in when the sentence was already tokenized (e.g. by the sentence bank)
+@instrument("analysis")
+def dyslexia_analysis(user_text, random_sentence, sentence_tokens=None):
+    if is_exact_match(user_text, random_sentence):
+        return 0  # Exact match, no dyslexia detected
 
+    if sentence_tokens is None:
+        sentence_tokens = tokenize_sentence(random_sentence)
+    dyslexia_scores = score_aligned_tokens(tokenize_and_clean_text(user_text), sentence_tokens)
+    instrumentation.increment("tokens_scored", len(dyslexia_scores))
+    return average_token_score(dyslexia_scores)
 
-# Perform dyslexia analysis for a user-entered sentence
-def dyslexia_analysis(user_text, random_sentence):
+# Original word-by-word analysis, which checks every word against the first word of the sentence
+# Kept for comparing against the aligned scores of dyslexia_analysis
+@instrument("legacy_analysis")
+def legacy_dyslexia_analysis(user_text, random_sentence, show_progress=None):
     if is_exact_match(user_text, random_sentence):
         return 0  # Exact match, no dyslexia detected
 
     words = tokenize_and_clean_text(user_text)
+    sentence_tokens = tokenize_sentence(random_sentence)
     dyslexia_scores = []
 
-    with tqdm(total=len(words), desc="Dyslexia Analysis Status") as pbar:
+    if show_progress is None:
+        show_progress = SHOW_PROGRESS
+
+    with tqdm.tqdm(total=len(words), desc="Dyslexia Analysis Status", disable=not show_progress) as pbar:
         for word in words:
-            dyslexia_score = calculate_word_dyslexia_score(word, random_sentence)
+            # Tokens are already cleaned, so score them directly instead of re-tokenizing each word
+            dyslexia_score = score_tokens((word,), sentence_tokens)
             dyslexia_scores.append(dyslexia_score)
             pbar.update(1)
 
-    avg_score = round(sum(dyslexia_scores) / len(dyslexia_scores), 3)
-    return avg_score
+    return average_token_score(dyslexia_scores)
 
-# Generate a PDF report with user's name and ID
-def generate_pdf_report(user_responses, dyslexia_scores, avg_score, final_verdict, user_name, user_id):
-    pdf_filename = f"{user_name}_{user_id}_dyslexia_report.pdf"
-
-    c = canvas.Canvas(pdf_filename, pagesize=letter)
-    width, height = letter  # Get page dimensions
-
-    # Title
-    title_font_size = 16
-    c.setFont("Helvetica-Bold", title_font_size)
-    title_text = "Dyslexia Analysis Report"
-    title_text_width = c.stringWidth(title_text, "Helvetica-Bold", title_font_size)
-    title_x = (width - title_text_width) / 2
-    c.drawString(title_x, height - 40, title_text)
-
-    # Add space between title and content
-    y_position = height - 70  # Adjust the vertical position
-
-    # User Name
-    user_name_font_size = 12
-    c.setFont("Helvetica-Bold", user_name_font_size)
-    user_name_text = "Full Legal Name:"
-    c.drawString(100, y_position, user_name_text)
-
-    c.setFont("Helvetica", user_name_font_size)
-    c.drawString(220, y_position, user_name)
-
-    # User ID
-    user_id_font_size = 12
-    c.setFont("Helvetica-Bold", user_id_font_size)
-    user_id_text = "State ID Number:"
-    y_position -= 20  # Space between User Name and User ID
-    c.drawString(100, y_position, user_id_text)
-
-    c.setFont("Helvetica", user_id_font_size)
-    c.drawString(220, y_position, user_id)
-
-    # User Responses
-    user_response_font_size = 14
-    c.setFont("Helvetica-Bold", user_response_font_size)
-    user_response_text = "User Responses:"
-    y_position -= 20  # Space between sections
-    c.drawString(100, y_position, user_response_text)
-
-    response_font_size = 12
-    y_position -= response_font_size + 2
+# Average of the non-zero response scores and the verdict it leads to
+def final_assessment(dyslexia_scores):
+    non_zero_scores = [score for score in dyslexia_scores if score > 0]
+    avg_score = round(sum(non_zero_scores) / len(non_zero_scores), 3) if non_zero_scores else 0.0
+    final_verdict = "Likelihood of dyslexia detected." if avg_score >= DYSLEXIA_SCORE_THRESHOLD else "No significant signs of dyslexia detected."
+    return avg_score, final_verdict
+
+# In-memory report of one patient's responses and scores; long lists continue on further pages
+def build_report(user_responses, dyslexia_scores, avg_score, final_verdict, user_name, user_id):
+    report = Report("Dyslexia Analysis Report")
+    report.field("Full Legal Name:", user_name)
+    report.field("State ID Number:", user_id)
+
+    report.heading("User Responses:")
     for response in user_responses:
-        c.setFont("Helvetica", response_font_size)
-        response_text = "- " + response.strip()
-        c.drawString(120, y_position, response_text)
-        y_position -= response_font_size + 2
-
-    # Dyslexia Scores
-    dyslexia_score_font_size = 14
-    c.setFont("Helvetica-Bold", dyslexia_score_font_size)
-    dyslexia_score_text = "Dyslexia Scores:"
-    y_position -= 20  # Space between sections
-    c.drawString(100, y_position, dyslexia_score_text)
-
-    score_font_size = 12
-    y_position -= score_font_size + 2
+        report.item(response.strip())
+
+    report.heading("Dyslexia Scores:")
     for score in dyslexia_scores:
-        formatted_score = "{:.3f}".format(score)
-        c.setFont("Helvetica", score_font_size)
-        score_text = "- Score: " + formatted_score
-        c.drawString(120, y_position, score_text)
-        y_position -= score_font_size + 2
-
-    # Average Score and Final Verdict
-    avg_score_font_size = 14
-    c.setFont("Helvetica-Bold", avg_score_font_size)
-    avg_score_text = "Average Dyslexia Score:"
-    y_position -= 20  # Space between sections
-    c.drawString(100, y_position, avg_score_text)
-
-    formatted_avg_score = "{:.3f}".format(avg_score)
-    c.setFont("Helvetica", avg_score_font_size)
-    avg_score_value_text = formatted_avg_score
-    avg_score_text_width = c.stringWidth(avg_score_text, "Helvetica-Bold", avg_score_font_size)
-    avg_score_value_text_width = c.stringWidth(avg_score_value_text, "Helvetica", avg_score_font_size)
-    x_position = 100 + avg_score_text_width + 10  # Space between text and value
-    c.drawString(x_position, y_position, avg_score_value_text)
-
-    final_verdict_font_size = 14
-    c.setFont("Helvetica-Bold", final_verdict_font_size)
-    final_verdict_text = "Final Verdict:"
-    y_position -= avg_score_font_size + 2
-    c.drawString(100, y_position, final_verdict_text)
-
-    x_position = 100 + c.stringWidth(final_verdict_text, "Helvetica-Bold",
-                                     final_verdict_font_size) + 10  # Space between text and value
-    c.setFont("Helvetica", final_verdict_font_size)
-
-    # Set the color to green if "Final Verdict" does not contain "dyslexic", else set it to red
+        report.item("Score: {:.3f}".format(score))
+
+    # Red if dyslexia is likely, else green
     text_color = "red" if "Likelihood of dyslexia detected." in final_verdict else "green"
-    c.setFillColor(text_color)
-    c.drawString(x_position, y_position, final_verdict)
+    report.space(10)
+    report.field("Average Dyslexia Score:", "{:.3f}".format(avg_score), size=14)
+    report.field("Final Verdict:", final_verdict, color=text_color, size=14)
+
+    report.space(24)
+    report.text("Signature: _____________", bold=True)
+    return report
 
-    # Add space before the signature
-    y_position -= 40
+# Append scored responses (dicts with the RESULT_COLUMNS fields) to a results table; returns its row count
+def export_results(rows, table_path=RESULTS_TABLE_PATH):
+    table = column_table.ColumnTable(table_path, RESULT_COLUMNS)
+    return table.append({name: [row[name] for row in rows] for name, _ in RESULT_COLUMNS})
 
-    # Signature line
-    signature_font_size = 12
-    text_color = "black"
-    c.setFillColor(text_color)
-    c.setFont("Helvetica-Bold", signature_font_size)
-    signature_text = "Signature: _____________"
-    c.drawString(100, y_position, signature_text)
+def report_filename(user_name, user_id):
+    return f"{user_name}_{user_id}_dyslexia_report.pdf"
 
-    # Save the PDF
-    c.save()
-    print(f"PDF report '{pdf_filename}' generated successfully.")
+# Generate a PDF report with user's name and ID on the background report service; returns a
+# future of the file name. The pdf_report stage times the rendering itself, on the service's worker.
+def generate_pdf_report(user_responses, dyslexia_scores, avg_score, final_verdict, user_name, user_id):
+    pdf_filename = report_filename(user_name, user_id)
+    report = build_report(user_responses, dyslexia_scores, avg_score, final_verdict, user_name, user_id)
+    timer = partial(instrumentation.record, "pdf_report") if instrumentation.is_enabled() else None
+    return default_service().submit(report, pdf_filename, timer)
 
 # Main program
 def main():
     user_responses = []
-    used_sentences = set()
+    response_sentences = []  # Index of the sentence each response was written for
+
+    # Load NLTK in the background while the patient's details are entered
+    threading.Thread(target=load_word_tokenizer, daemon=True).start()
 
     try:
         user_name = input("\nPlease enter the patient's name: ").strip()
@@ -256,13 +397,15 @@ def main():
 
         max_attempts = 3
 
-        for attempt in range(max_attempts):
-            sentences = read_sentences_from_file("sentences.txt")
-            if not sentences:
-                print("Unable to read sentences from the file. Exiting.")
-                return
+        sentence_bank = load_sentence_bank(SENTENCES_PATH)
+        if not sentence_bank:
+            print("Unable to read sentences from the file. Exiting.")
+            return
 
-            random_sentence = random.choice(sentences).strip()
+        for attempt in range(max_attempts):
+            # Sampled without replacement, so a patient never gets the same sentence twice
+            sentence_index = sentence_bank.sample_index()
+            random_sentence = sentence_bank[sentence_index]
             print(f"\nGenerated Sentence (Attempt {attempt + 1}): {random_sentence}")
 
             while True:
@@ -272,11 +415,17 @@ def main():
                     print("Empty input received. Please try again.")
                     continue
 
+                if not tokenize_and_clean_text(user_text):
+                    print("No words found in the input. Please try again.")
+                    continue
+
                 if is_exact_match(user_text, random_sentence):
                     user_responses.append(user_text)
+                    response_sentences.append(sentence_index)
                     break
                 elif are_strings_similar(user_text, random_sentence, SIMILARITY_THRESHOLD):
                     user_responses.append(user_text)
+                    response_sentences.append(sentence_index)
                     break
                 else:
                     print("Your response is significantly different from the generated sentence. Please try again.")
@@ -284,22 +433,32 @@ def main():
                     print(f"Copy the following sentence: {random_sentence}")
 
         dyslexia_scores = []
-        for response in user_responses:
-            score = dyslexia_analysis(response, random_sentence)
-            if score > 0:
-                dyslexia_scores.append(score)
-
-        non_zero_scores = [score for score in dyslexia_scores if score > 0]
-        avg_score = round(sum(non_zero_scores) / len(non_zero_scores), 3) if non_zero_scores else 0.0
-
-        final_verdict = "Likelihood of dyslexia detected." if avg_score >= DYSLEXIA_SCORE_THRESHOLD else "No significant signs of dyslexia detected."
+        results = []
+        for response, sentence_index in zip(user_responses, response_sentences):
+            # Score each response against the sentence it was written for
+            sentence, sentence_tokens = sentence_bank[sentence_index], sentence_bank.tokens[sentence_index]
+            # One pass gives both the score and the rule hits stored in the results table
+            breakdown = score_breakdown(response, sentence, sentence_tokens)
+            if breakdown["score"] > 0:
+                dyslexia_scores.append(breakdown["score"])
+            if RESULTS_TABLE_PATH:
+                results.append(dict(breakdown, recorded_at=time.time(), student_id=user_id, name=user_name,
+                                    sentence=sentence, response=response))
+
+        avg_score, final_verdict = final_assessment(dyslexia_scores)
+        # The PDF is laid out in the background while the results are printed
+        report = generate_pdf_report(user_responses, dyslexia_scores, avg_score, final_verdict, user_name, user_id)
         print(f"\nAverage Dyslexia Score: {avg_score:.3f}\nFinal Verdict: {final_verdict}")
-
-        generate_pdf_report(user_responses, dyslexia_scores, avg_score, final_verdict, user_name, user_id)
+        print(f"PDF report '{report.result()}' generated successfully.")
+        if results:
+            export_results(results)
+            print(f"Results added to '{RESULTS_TABLE_PATH}'.")
 
 
     except KeyboardInterrupt:
         print("\nOperation aborted by the user.")
 
 if __name__ == "__main__":
+    if METRICS_PATH and instrumentation.is_enabled():
+        atexit.register(instrumentation.write_metrics, METRICS_PATH)
     main()
\ No newline at end of file
@@ -0,0 +1,231 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import Dyslexia
+import instrumentation
+from report_renderer import ReportService
+
+# Columns/keys expected in every input record
+RECORD_FIELDS = ("student_id", "name", "sentence", "response")
+DEFAULT_CHUNK_SIZE = 256
+
+# Scoring engines selectable with --engine
+ENGINES = {
+    "aligned": Dyslexia.dyslexia_analysis,
+    "legacy": lambda response, sentence: Dyslexia.legacy_dyslexia_analysis(response, sentence, show_progress=False),
+}
+
+
+# Stream records from a CSV (with a header row) or JSONL file, one dict at a time
+def read_records(path):
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in file:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+# Group an iterable into lists of at most chunk_size items without reading ahead
+def chunked(iterable, chunk_size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Fields score_breakdown() adds to a result
+BREAKDOWN_FIELDS = ("tokens", "clean_tokens") + Dyslexia.RULE_FIELDS
+
+
+# Score a single record, optionally with its rule hits (aligned engine only, whose score they add
+# up to); failures are reported in the result instead of aborting the batch
+def score_record(record, engine="aligned", breakdown=False):
+    result = {field: record.get(field, "") for field in RECORD_FIELDS}
+    sentence = (result["sentence"] or "").strip()
+    response = (result["response"] or "").strip()
+    try:
+        if breakdown:
+            if engine != "aligned":
+                raise ValueError(f"Rule hits are only available for the aligned engine, not '{engine}'.")
+            rule_hits = Dyslexia.score_breakdown(response, sentence)
+            score = rule_hits["score"]
+        else:
+            score = ENGINES[engine](response, sentence)
+        result["similar"] = Dyslexia.are_strings_similar(response, sentence, Dyslexia.SIMILARITY_THRESHOLD)
+        result["score"] = score
+        result["likely_dyslexic"] = score >= Dyslexia.DYSLEXIA_SCORE_THRESHOLD
+        if breakdown:
+            result.update((field, rule_hits[field]) for field in BREAKDOWN_FIELDS)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+# Score a chunk of records; also returns this process's token cache counters and stage metrics
+def score_chunk(records, engine="aligned", breakdown=False):
+    results = [score_record(record, engine, breakdown) for record in records]
+    metrics = instrumentation.snapshot() if instrumentation.is_enabled() else None
+    return results, os.getpid(), Dyslexia.token_score_cache.stats(), metrics
+
+
+# Pool initializer: importing Dyslexia maps the vocabulary and compiles the rules once per worker,
+# and a first tokenization loads NLTK's tokenizer models before any real record arrives
+def init_worker(cache_size=None, metrics=False):
+    if cache_size is not None:
+        Dyslexia.token_score_cache.resize(cache_size)
+    Dyslexia.tokenize_and_clean_text("warm up")
+    if metrics:
+        instrumentation.reset()
+        instrumentation.enable()
+
+
+# Add up the latest token cache counters reported by each worker
+def combine_cache_stats(stats_by_worker):
+    combined = {"hits": 0, "misses": 0, "evictions": 0, "size": 0}
+    for stats in stats_by_worker.values():
+        for field in combined:
+            combined[field] += stats[field]
+    lookups = combined["hits"] + combined["misses"]
+    combined["hit_rate"] = round(combined["hits"] / lookups, 4) if lookups else 0.0
+    return combined
+
+
+# Score every record in input_path and stream the results to output_path as JSONL, and with
+# table_path also append them, with their rule hits, to that results table
+# Only `workers * 2` chunks are in flight at once, so memory stays flat however large the input is
+def run_batch(input_path, output_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, engine="aligned", cache_size=None,
+              metrics=False, table_path=None):
+    if table_path and engine != "aligned":
+        raise ValueError("The results table stores rule hits, which only the aligned engine produces.")
+    workers = workers or os.cpu_count() or 1
+    total = errors = 0
+    cache_stats = {}
+    metrics_by_worker = {}
+    start = time.perf_counter()
+    recorded_at = time.time()
+
+    with open(output_path, "w", encoding="utf-8") as output:
+        def write_results(chunk_result):
+            nonlocal total, errors
+            results, worker_pid, worker_cache_stats, worker_metrics = chunk_result
+            cache_stats[worker_pid] = worker_cache_stats
+            if worker_metrics is not None:
+                metrics_by_worker[worker_pid] = worker_metrics
+            for result in results:
+                output.write(json.dumps(result) + "\n")
+                total += 1
+                errors += "error" in result
+            output.flush()
+            if table_path:
+                export_results(results, table_path, recorded_at)
+
+        chunks = chunked(read_records(input_path), chunk_size)
+        if workers == 1:
+            init_worker(cache_size, metrics)
+            for chunk in chunks:
+                write_results(score_chunk(chunk, engine, bool(table_path)))
+        else:
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cache_size, metrics)) as executor:
+                for chunk in chunks:
+                    pending.append(executor.submit(score_chunk, chunk, engine, bool(table_path)))
+                    if len(pending) >= workers * 2:
+                        write_results(pending.popleft().result())
+                while pending:
+                    write_results(pending.popleft().result())
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "records": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "records_per_second": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "token_cache": combine_cache_stats(cache_stats),
+    }
+    if metrics:
+        summary["metrics"] = instrumentation.merge_snapshots(metrics_by_worker.values())
+    return summary
+
+
+# Append the scored results of a chunk to the results table
+def export_results(results, table_path, recorded_at):
+    rows = [dict(result, recorded_at=recorded_at) for result in results if "error" not in result]
+    if rows:
+        Dyslexia.export_results(rows, table_path)
+
+
+# Render one PDF report per student from a results file, spreading them over worker processes;
+# returns the number of reports written
+def write_student_reports(results_path, reports_dir, workers=None):
+    students = {}
+    for result in read_records(results_path):
+        if "error" in result:
+            continue
+        responses, scores = students.setdefault((result["name"], result["student_id"]), ([], []))
+        responses.append(result["response"])
+        scores.append(result["score"])
+
+    os.makedirs(reports_dir, exist_ok=True)
+    jobs = []
+    for (name, student_id), (responses, scores) in students.items():
+        scores = [score for score in scores if score > 0]  # As in the interactive test
+        avg_score, final_verdict = Dyslexia.final_assessment(scores)
+        report = Dyslexia.build_report(responses, scores, avg_score, final_verdict, name, student_id)
+        jobs.append((report, os.path.join(reports_dir, Dyslexia.report_filename(name, student_id))))
+    workers = workers or os.cpu_count() or 1
+    with ReportService(workers, processes=workers > 1) as service:
+        service.render_all(jobs)
+    return len(jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV/JSONL file of transcribed responses for signs of dyslexia.")
+    parser.add_argument("input", help=f"CSV or JSONL file with fields: {', '.join(RECORD_FIELDS)}")
+    parser.add_argument("--output", default="dyslexia_results.jsonl", help="JSONL file to write results to")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records sent to a worker at a time")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="aligned", help="Scoring engine (legacy is the original word-by-word scoring)")
+    parser.add_argument("--cache-size", type=int, default=None, help="Token score cache entries per worker (0 disables it)")
+    parser.add_argument("--metrics", help="Write per-stage metrics to this file (.prom for Prometheus text, else JSON)")
+    parser.add_argument("--table", metavar="DIR", help="Also append the results, with their rule hits, to this column table")
+    parser.add_argument("--reports", metavar="DIR", help="Also write a PDF report for every student into DIR")
+    args = parser.parse_args()
+    if args.table and args.engine != "aligned":
+        parser.error("--table needs the aligned engine, whose scores the stored rule hits add up to")
+
+    if not os.path.exists(args.input):
+        print(f"File '{args.input}' not found.")
+        sys.exit(1)
+
+    summary = run_batch(args.input, args.output, args.workers, args.chunk_size, args.engine, args.cache_size,
+                        metrics=bool(args.metrics), table_path=args.table)
+    print(f"Scored {summary['records']} records ({summary['errors']} errors) in {summary['seconds']:.3f}s "
+          f"- {summary['records_per_second']} records/s. Results written to '{args.output}'.")
+    cache = summary["token_cache"]
+    print(f"Token cache: {cache['hits']} hits, {cache['misses']} misses, {cache['evictions']} evictions "
+          f"(hit rate {cache['hit_rate']:.1%}).")
+    if args.metrics:
+        instrumentation.write_metrics(args.metrics, summary["metrics"])
+        print(f"Stage metrics written to '{args.metrics}'.")
+    if args.table:
+        print(f"Results added to the table '{args.table}'.")
+    if args.reports:
+        start = time.perf_counter()
+        count = write_student_reports(args.output, args.reports, args.workers)
+        print(f"{count} student reports written to '{args.reports}' in {time.perf_counter() - start:.3f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+from collections import Counter, deque
+
+
+# Read word confusion sets from a data file: one comma-separated set per line, '#' starts a comment
+def load_word_confusions(filename):
+    confusions = []
+    with open(filename, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                confusions.append(tuple(word.strip().lower() for word in line.split(",") if word.strip()))
+    return confusions
+
+
+class ConfusionMatcher:
+    """Aho-Corasick automaton over every word of every confusion set.
+
+    A set scores when all of its words occur somewhere in a token. One linear pass over the
+    token finds every word occurrence, and only the sets containing a found word are checked,
+    so the cost does not grow with the size of the lexicon.
+    """
+
+    def __init__(self, confusions, weight=4.0):
+        # Sets listed more than once (in any order) are merged and keep their combined weight
+        counts = Counter(frozenset(confusion) for confusion in confusions if confusion)
+        self.words = sorted({word for confusion in counts for word in confusion})
+        word_ids = {word: word_id for word_id, word in enumerate(self.words)}
+
+        self.rules = []
+        self.rules_by_word = [[] for _ in self.words]
+        for confusion, count in counts.items():
+            rule_id = len(self.rules)
+            self.rules.append((frozenset(word_ids[word] for word in confusion), weight * count))
+            for word in confusion:
+                self.rules_by_word[word_ids[word]].append(rule_id)
+
+        self._build_automaton()
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _build_automaton(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for word_id, word in enumerate(self.words):
+            state = 0
+            for char in word:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state] += (word_id,)
+
+        # Breadth-first pass to set failure links and inherit the outputs of suffix states
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    # Ids of every confusion word that occurs in the token
+    def find_words(self, token):
+        found = set()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in token:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    # Total weight of the confusion sets whose words all occur in the token
+    def score(self, token):
+        found = self.find_words(token)
+        if not found:
+            return 0
+        score = 0
+        checked = set()
+        for word_id in found:
+            for rule_id in self.rules_by_word[word_id]:
+                if rule_id not in checked:
+                    checked.add(rule_id)
+                    rule_words, weight = self.rules[rule_id]
+                    if rule_words <= found:
+                        score += weight
+        return score
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Instrumentation is off unless DYSLEXIA_METRICS is set or enable() is called. While off, an
+# instrumented function costs one extra call and a flag check.
+_enabled = os.environ.get("DYSLEXIA_METRICS", "").lower() in ("1", "true", "yes", "on")
+_lock = threading.Lock()
+_stages = {}    # stage -> [count, total seconds, max seconds, bucket counts]
+_counters = {}  # name -> count
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+# Record one latency sample for a stage
+def record(stage, seconds):
+    with _lock:
+        stats = _stages.get(stage)
+        if stats is None:
+            stats = _stages[stage] = [0, 0.0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1)]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        stats[3][bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+
+def increment(name, amount=1):
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + amount
+
+
+# Decorator timing every call of a function as the given pipeline stage while enabled
+def instrument(stage):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# Plain-dict copy of every stage and counter (JSON serializable, mergeable across processes)
+def snapshot():
+    with _lock:
+        return {
+            "buckets": list(LATENCY_BUCKETS),
+            "stages": {
+                stage: {"count": count, "total_seconds": total, "mean_seconds": total / count, "max_seconds": maximum,
+                        "bucket_counts": list(buckets)}
+                for stage, (count, total, maximum, buckets) in _stages.items()
+            },
+            "counters": dict(_counters),
+        }
+
+
+# Combine snapshots taken in several processes into one
+def merge_snapshots(snapshots):
+    merged = {"buckets": list(LATENCY_BUCKETS), "stages": {}, "counters": {}}
+    for snap in snapshots:
+        for stage, stats in snap["stages"].items():
+            target = merged["stages"].setdefault(
+                stage, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "bucket_counts": [0] * (len(LATENCY_BUCKETS) + 1)})
+            target["count"] += stats["count"]
+            target["total_seconds"] += stats["total_seconds"]
+            target["max_seconds"] = max(target["max_seconds"], stats["max_seconds"])
+            target["bucket_counts"] = [a + b for a, b in zip(target["bucket_counts"], stats["bucket_counts"])]
+            target["mean_seconds"] = target["total_seconds"] / target["count"]
+        for name, count in snap["counters"].items():
+            merged["counters"][name] = merged["counters"].get(name, 0) + count
+    return merged
+
+
+def export_json(snap=None):
+    return json.dumps(snap or snapshot(), indent=2)
+
+
+# Prometheus text exposition format: one histogram over stages plus one counter family
+def export_prometheus(snap=None, prefix="dyslexia"):
+    snap = snap or snapshot()
+    lines = [
+        f"# HELP {prefix}_stage_seconds Latency of each scoring pipeline stage.",
+        f"# TYPE {prefix}_stage_seconds histogram",
+    ]
+    for stage, stats in sorted(snap["stages"].items()):
+        cumulative = 0
+        for bound, count in zip(list(snap["buckets"]) + ["+Inf"], stats["bucket_counts"]):
+            cumulative += count
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["total_seconds"]}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+    if snap["counters"]:
+        lines.append(f"# HELP {prefix}_events_total Pipeline event counters.")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, count in sorted(snap["counters"].items()):
+            lines.append(f'{prefix}_events_total{{name="{name}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+# Write metrics to a file; a .prom extension selects the Prometheus format, anything else JSON
+def write_metrics(path, snap=None):
+    text = export_prometheus(snap) if path.endswith(".prom") else export_json(snap)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
@@ -0,0 +1,428 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import Dyslexia
+import instrumentation
+from batch_scoring import BREAKDOWN_FIELDS, init_worker, score_record
+from report_renderer import default_service
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_PENDING = 1024  # Score requests that may wait for a worker; beyond this new ones are rejected as busy
+MAX_BATCH = 64  # Score requests handed to a worker at a time
+BATCH_WAIT_SECONDS = 0.002  # How long a batch waits for more requests once the first one arrives
+LATENCY_STAGES = ("service_score", "service_similarity", "service_report")
+
+
+class ServiceBusy(RuntimeError):
+    """Raised when too many score requests are already waiting for a worker."""
+
+
+class ScoringError(ValueError):
+    """Raised when a worker could not score a response (e.g. one without any words)."""
+
+
+# Worker side: score a batch of (response, sentence, breakdown) requests
+def score_batch(requests):
+    results = []
+    for response, sentence, breakdown in requests:
+        result = score_record({"response": response, "sentence": sentence}, "aligned", breakdown)
+        results.append({field: result[field] for field in ("score", "similar", "likely_dyslexic", "error") + BREAKDOWN_FIELDS
+                        if field in result})
+    return results
+
+
+class ScoringService:
+    """Long-running Dyslexia scoring service that keeps the vocabulary, rules and sentence bank warm.
+
+    Score requests wait in a bounded queue and are handed to the worker pool in batches: a batch
+    holds whatever arrived within BATCH_WAIT_SECONDS of its first request, up to max_batch. At most
+    two batches per worker are in flight, so under load the queue fills and further requests fail
+    fast with ServiceBusy instead of piling up. Every endpoint's latency is recorded as an
+    instrumentation stage.
+    """
+
+    def __init__(self, workers=None, max_pending=MAX_PENDING, max_batch=MAX_BATCH, batch_wait=BATCH_WAIT_SECONDS,
+                 report_dir="."):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.report_dir = report_dir
+        self.sentence_bank = None
+        self.batches = 0
+        self.batched_requests = 0
+        self.rejected = 0
+        self._executor = None
+        self._queue = None
+        self._slots = None
+        self._batcher = None
+        self._in_flight = set()
+        # The results table takes one appending writer at a time (see ColumnTable)
+        self._export_lock = asyncio.Lock()
+
+    async def start(self):
+        # Each worker maps the vocabulary, compiles the rules and loads NLTK once, up front
+        if self.workers == 1:
+            self._executor = ThreadPoolExecutor(max_workers=1, initializer=init_worker)
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker)
+        loop = asyncio.get_running_loop()
+        self.sentence_bank = await loop.run_in_executor(None, Dyslexia.load_sentence_bank, Dyslexia.SENTENCES_PATH)
+        await asyncio.gather(*(loop.run_in_executor(self._executor, score_batch, []) for _ in range(self.workers)))
+        self._queue = asyncio.Queue(self.max_pending)
+        self._slots = asyncio.Semaphore(self.workers * 2)
+        self._batcher = asyncio.create_task(self._run_batcher())
+
+    # Finish the queued requests, then stop the workers
+    async def stop(self):
+        await self._queue.join()
+        self._batcher.cancel()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        self._executor.shutdown()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    # The bank sentence at index, which must be one of the bank's own indexes
+    def bank_sentence(self, index):
+        if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < len(self.sentence_bank):
+            raise ValueError(f"sentence_index must be an integer from 0 to {len(self.sentence_bank) - 1}, not {index!r}")
+        return self.sentence_bank[index]
+
+    # Score a response against a sentence (or the bank sentence at sentence_index); with
+    # breakdown=True the result also has the per-rule score totals. Raises ScoringError if the
+    # response cannot be scored.
+    async def score(self, response, sentence=None, sentence_index=None, breakdown=False):
+        start = time.perf_counter()
+        if sentence is None:
+            if sentence_index is None:
+                raise ValueError("A score request needs a sentence or a sentence_index")
+            sentence = self.bank_sentence(sentence_index)
+        if not isinstance(response, str) or not isinstance(sentence, str):
+            raise TypeError("response and sentence must be strings")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((response.strip(), sentence.strip(), breakdown, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise ServiceBusy(f"{self.max_pending} requests are already waiting; try again later") from None
+        try:
+            result = await future
+        finally:
+            instrumentation.record("service_score", time.perf_counter() - start)
+        if "error" in result:
+            raise ScoringError(result["error"])
+        return result
+
+    # Whether a response is close enough to its sentence to be scored
+    async def similarity(self, response, sentence):
+        if not isinstance(response, str) or not isinstance(sentence, str):
+            raise TypeError("response and sentence must be strings")
+        start = time.perf_counter()
+        similar = Dyslexia.are_strings_similar(response, sentence, Dyslexia.SIMILARITY_THRESHOLD)
+        instrumentation.record("service_similarity", time.perf_counter() - start)
+        return {"similar": similar, "exact": Dyslexia.is_exact_match(response, sentence)}
+
+    # A sentence from the bank for the next attempt, drawn without replacement
+    async def sentence(self, subject=None, grade=None):
+        index = self.sentence_bank.sample_index(subject, grade)
+        return {"sentence_index": index, "sentence": self.sentence_bank[index]}
+
+    # Where a patient's report is written: always a file directly inside report_dir. The name and
+    # id come from the client, so anything that could lead out of it is rejected.
+    def report_path(self, user_name, user_id):
+        for field, value in (("user_name", user_name), ("user_id", user_id)):
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"{field} must be a non-empty string")
+            if any(part in value for part in ("/", "\\", "\0", "..")):
+                raise ValueError(f"{field} must not contain path separators or '..'")
+        report_dir = os.path.realpath(self.report_dir)
+        path = os.path.realpath(os.path.join(report_dir, Dyslexia.report_filename(user_name, user_id)))
+        if os.path.dirname(path) != report_dir:
+            raise ValueError("The report would be written outside the report directory")
+        return path
+
+    # Score a patient's responses ([{"response", "sentence" or "sentence_index"}, ...]) and write
+    # their PDF report; the responses are also added to the results table if it is enabled
+    async def report(self, user_name, user_id, responses):
+        start = time.perf_counter()
+        path = self.report_path(user_name, user_id)
+        sentences = [item.get("sentence") or self.bank_sentence(item.get("sentence_index")) for item in responses]
+        try:
+            results = await asyncio.gather(*(self.score(item["response"], sentence, breakdown=True)
+                                             for item, sentence in zip(responses, sentences)))
+        except ScoringError as e:
+            raise ScoringError(f"Could not score every response: {e}") from None
+
+        dyslexia_scores = [result["score"] for result in results if result["score"] > 0]
+        avg_score, final_verdict = Dyslexia.final_assessment(dyslexia_scores)
+        user_responses = [item["response"] for item in responses]
+        report = Dyslexia.build_report(user_responses, dyslexia_scores, avg_score, final_verdict, user_name, user_id)
+        await asyncio.wrap_future(default_service().submit(report, path))
+        if Dyslexia.RESULTS_TABLE_PATH:
+            recorded_at = time.time()
+            rows = [dict(result, recorded_at=recorded_at, student_id=user_id, name=user_name, sentence=sentence,
+                         response=item["response"]) for item, sentence, result in zip(responses, sentences, results)]
+            async with self._export_lock:
+                await asyncio.to_thread(Dyslexia.export_results, rows)
+        instrumentation.record("service_report", time.perf_counter() - start)
+        return {"report": path, "scores": [result["score"] for result in results], "avg_score": avg_score,
+                "final_verdict": final_verdict}
+
+    # Queue depth, batching counters and per-endpoint latency histograms
+    def metrics(self):
+        stages = instrumentation.snapshot()["stages"]
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "batches_in_flight": len(self._in_flight),
+            "batches": self.batches,
+            "mean_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else 0.0,
+            "rejected": self.rejected,
+            "latency": {stage: stages[stage] for stage in LATENCY_STAGES if stage in stages},
+        }
+
+    # Run one request ({"op": endpoint, ...parameters}); every error is returned as
+    # {"id", "ok": False, "error"}, never raised
+    async def handle(self, request):
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict):
+                raise TypeError("A request must be a JSON object")
+            op = request.get("op")
+            params = {key: value for key, value in request.items() if key not in ("op", "id")}
+            if op == "score":
+                result = await self.score(**params)
+            elif op == "similarity":
+                result = await self.similarity(**params)
+            elif op == "sentence":
+                result = await self.sentence(**params)
+            elif op == "report":
+                result = await self.report(**params)
+            elif op == "metrics":
+                result = self.metrics()
+            else:
+                raise ValueError(f"Unknown operation {op!r}")
+        except ServiceBusy as e:
+            return {"id": request_id, "ok": False, "busy": True, "error": str(e)}
+        except ScoringError as e:
+            return {"id": request_id, "ok": False, "error": str(e)}
+        except Exception as e:
+            return {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {"id": request_id, "ok": True, "result": result}
+
+    async def _run_batcher(self):
+        while True:
+            batch = [await self._queue.get()]
+            if self.batch_wait and self._queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.batch_wait)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._slots.acquire()
+            task = asyncio.create_task(self._score_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _score_batch(self, batch):
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._executor, score_batch, [(response, sentence, breakdown) for response, sentence, breakdown, _ in batch])
+            for (_, _, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self.batches += 1
+            self.batched_requests += len(batch)
+            self._slots.release()
+            for _ in batch:
+                self._queue.task_done()
+
+    # Serve requests as JSON lines over TCP; requests on one connection are handled concurrently,
+    # so a client can pipeline them and have them batched together
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line):
+            try:
+                response = await self.handle(json.loads(line))
+            except ValueError as e:  # Not JSON, or not UTF-8
+                response = {"id": None, "ok": False, "error": f"Invalid request: {e}"}
+            try:
+                async with write_lock:
+                    writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                    await writer.drain()
+            except ConnectionError:
+                pass  # The client went away before its response
+
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+
+class LocalClient:
+    """Stand-in client for a ScoringService in the same event loop.
+
+    Requests and responses go through JSON exactly as on the socket, so code and tests written
+    against this client behave the same against a served instance, without a network.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self._ids = 0
+
+    async def request(self, op, **params):
+        self._ids += 1
+        request = json.loads(json.dumps(dict(params, op=op, id=self._ids)))
+        return json.loads(json.dumps(await self.service.handle(request)))
+
+    async def call(self, op, **params):
+        response = await self.request(op, **params)
+        if not response["ok"]:
+            raise ServiceBusy(response["error"]) if response.get("busy") else RuntimeError(response["error"])
+        return response["result"]
+
+    async def score(self, response, sentence=None, sentence_index=None, breakdown=False):
+        return await self.call("score", response=response, sentence=sentence, sentence_index=sentence_index,
+                               breakdown=breakdown)
+
+    async def similarity(self, response, sentence):
+        return await self.call("similarity", response=response, sentence=sentence)
+
+    async def sentence(self, subject=None, grade=None):
+        return await self.call("sentence", subject=subject, grade=grade)
+
+    async def report(self, user_name, user_id, responses):
+        return await self.call("report", user_name=user_name, user_id=user_id, responses=responses)
+
+    async def metrics(self):
+        return await self.call("metrics")
+
+
+class SocketClient(LocalClient):
+    """Client for a service started with --serve, over one pipelined connection."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        super().__init__(None)
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+        self._waiting = {}
+        self._receiver = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._receiver = asyncio.create_task(self._receive())
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._receiver.cancel()
+
+    async def request(self, op, **params):
+        if self._receiver is None or self._receiver.done():
+            raise ConnectionError("Not connected to the scoring service.")
+        self._ids += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[self._ids] = future
+        self._writer.write(json.dumps(dict(params, op=op, id=self._ids)).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        return await future
+
+    # Hand each response to the request waiting for it; once the connection ends, every request
+    # still waiting fails with ConnectionError
+    async def _receive(self):
+        error = ConnectionError("The scoring service closed the connection.")
+        try:
+            while line := await self._reader.readline():
+                response = json.loads(line)
+                future = self._waiting.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (ConnectionError, ValueError) as e:
+            error = ConnectionError(f"Lost the connection to the scoring service: {e}")
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._waiting.clear()
+
+
+# Score `count` bank sentences with injected transpositions through a LocalClient, all at once
+async def run_local(count, workers, max_pending):
+    async with ScoringService(workers, max_pending=max_pending) as service:
+        client = LocalClient(service)
+        rng = random.Random(0)
+        requests = []
+        for _ in range(count):
+            index = rng.randrange(len(service.sentence_bank))
+            words = service.sentence_bank[index].split()
+            i = rng.randrange(len(words))
+            if len(words[i]) > 2:
+                words[i] = words[i][1] + words[i][0] + words[i][2:]
+            requests.append(client.request("score", response=" ".join(words), sentence_index=index))
+        start = time.perf_counter()
+        responses = await asyncio.gather(*requests)
+        elapsed = time.perf_counter() - start
+        busy = sum(bool(response.get("busy")) for response in responses)
+        print(f"{count} requests in {elapsed:.3f}s ({count / elapsed:.0f}/s), {busy} rejected as busy")
+        metrics = await client.metrics()
+        print(f"{metrics['batches']} batches, {metrics['mean_batch_size']} requests per batch")
+        for stage, stats in metrics["latency"].items():
+            print(f"{stage}: {stats['count']} requests, mean {stats['mean_seconds'] * 1000:.1f} ms, "
+                  f"max {stats['max_seconds'] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Dyslexia scoring with warm vocabulary, rules and sentence bank.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="Scoring worker processes (default: all cores)")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING, help="Queued score requests before rejecting")
+    parser.add_argument("--report-dir", default=".", help="Where report requests write their PDFs")
+    parser.add_argument("--local", type=int, metavar="N",
+                        help="Instead of serving, score N requests through an in-process client and print the metrics")
+    args = parser.parse_args()
+
+    if args.local:
+        asyncio.run(run_local(args.local, args.workers, args.max_pending))
+        return
+
+    async def serve():
+        async with ScoringService(args.workers, max_pending=args.max_pending, report_dir=args.report_dir) as service:
+            print(f"Scoring service ready on {args.host}:{args.port} with {service.workers} workers.")
+            await service.serve(args.host, args.port)
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import pickle
+import random
+
+BANK_CACHE_VERSION = 2
+BANK_CACHE_SUFFIX = ".bank"
+
+
+# Parse a sentence bank file. Each line is either a sentence, or "subject<TAB>grade<TAB>sentence"
+def parse_bank_lines(lines):
+    entries = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        parts = line.split("\t")
+        if len(parts) >= 3:
+            entries.append((parts[0].strip(), parts[1].strip(), "\t".join(parts[2:]).strip()))
+        else:
+            entries.append((None, None, line))
+    return entries
+
+
+def file_digest(filename):
+    digest = hashlib.sha1()
+    with open(filename, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SentenceBank:
+    """Pre-tokenized sentence bank with O(1) random sampling without replacement.
+
+    Sentences are tokenized once, either when the bank is built or when its binary cache is
+    loaded, and each one keeps its token list and token count. Per-token character masks are not
+    stored: the letter rules mask the response's tokens, never the sentence's, and the similarity
+    gate prunes on lengths, so nothing would read them.
+    """
+
+    def __init__(self, sentences, tokens, subjects=None, grades=None, rng=None):
+        self.sentences = sentences
+        self.tokens = tokens
+        self.lengths = [len(sentence_tokens) for sentence_tokens in tokens]
+        self.subjects = subjects or [None] * len(sentences)
+        self.grades = grades or [None] * len(sentences)
+        self.rng = rng or random.Random()
+        # (subject, grade) -> [shuffled indices, number not yet drawn this round]
+        self._pools = {}
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def __getitem__(self, index):
+        return self.sentences[index]
+
+    @classmethod
+    def build(cls, entries, tokenize):
+        subjects, grades, sentences = (list(column) for column in zip(*entries)) if entries else ([], [], [])
+        tokens = [tuple(tokenize(sentence)) for sentence in sentences]
+        return cls(sentences, tokens, subjects, grades)
+
+    # Load a bank file, reusing its binary cache when the file is unchanged since the cache was written
+    @classmethod
+    def load(cls, filename, tokenize, cache_path=None):
+        cache_path = cache_path or filename + BANK_CACHE_SUFFIX
+        stat = os.stat(filename)
+        cached = cls._read_cache(cache_path)
+        if cached is not None:
+            # Size and mtime are checked first; the content hash settles a touched-but-unchanged file,
+            # whose cache is then rewritten with the new mtime so the next load skips the hash
+            if (cached["size"], cached["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                return cached["bank"]
+            sha1 = file_digest(filename)
+            if cached["sha1"] == sha1:
+                cached["bank"]._write_cache(cache_path, stat, sha1)
+                return cached["bank"]
+
+        with open(filename, "r", encoding="utf-8") as file:
+            bank = cls.build(parse_bank_lines(file), tokenize)
+        bank._write_cache(cache_path, stat, file_digest(filename))
+        return bank
+
+    # The cache's fields with the bank it holds, or None if it is missing, stale or unreadable;
+    # any failure to read it only means the bank is built again
+    @classmethod
+    def _read_cache(cls, cache_path):
+        try:
+            with open(cache_path, "rb") as file:
+                cached = pickle.load(file)
+            if cached.get("format") != BANK_CACHE_VERSION:
+                return None
+            cached["bank"] = cls(cached["sentences"], cached["tokens"], cached["subjects"], cached["grades"])
+            return cached if all(field in cached for field in ("size", "mtime_ns", "sha1")) else None
+        except Exception:
+            return None
+
+    def _write_cache(self, cache_path, stat, sha1):
+        cached = {
+            "format": BANK_CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha1": sha1,
+            "sentences": self.sentences,
+            "tokens": self.tokens,
+            "subjects": self.subjects,
+            "grades": self.grades,
+        }
+        try:
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, "wb") as file:
+                pickle.dump(cached, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Could not write sentence bank cache '{cache_path}': {e}")
+
+    # Draw a sentence index that has not been drawn yet in this round; once every matching
+    # sentence has been drawn a new round starts. Each draw is a single swap, so it is O(1).
+    def sample_index(self, subject=None, grade=None):
+        key = (subject, grade)
+        pool = self._pools.get(key)
+        if pool is None:
+            indices = [i for i in range(len(self.sentences))
+                       if (subject is None or self.subjects[i] == subject) and (grade is None or self.grades[i] == grade)]
+            if not indices:
+                raise LookupError(f"No sentences for subject={subject!r}, grade={grade!r}.")
+            pool = self._pools[key] = [indices, len(indices)]
+
+        indices, remaining = pool
+        if remaining == 0:
+            remaining = len(indices)
+        position = self.rng.randrange(remaining)
+        last = remaining - 1
+        indices[position], indices[last] = indices[last], indices[position]
+        pool[1] = last
+        return indices[last]
+
+    def sample(self, subject=None, grade=None):
+        return self.sentences[self.sample_index(subject, grade)]
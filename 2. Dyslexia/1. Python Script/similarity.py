@@ -0,0 +1,116 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fuzzywuzzy import fuzz
+
+# Below this many pairs a process pool costs more than it saves
+PARALLEL_MIN_PAIRS = 20000
+
+# Lower-cased candidates shared by every row scored in this process (set once per worker)
+_candidates = []
+
+
+def _set_candidates(candidates):
+    global _candidates
+    _candidates = [(candidate, len(candidate)) for candidate in candidates]
+
+
+# Score one lower-cased response against every candidate. fuzz.ratio can never exceed
+# round(200 * min(len) / (len1 + len2)), so pairs whose lengths alone rule out the threshold
+# are skipped without running the matcher and reported as 0.
+def _score_row(response, threshold):
+    response_length = len(response)
+    row = []
+    for candidate, candidate_length in _candidates:
+        total_length = response_length + candidate_length
+        if total_length and int(round(200 * min(response_length, candidate_length) / total_length)) < threshold:
+            row.append(0)
+            continue
+        score = fuzz.ratio(response, candidate)
+        row.append(score if score >= threshold else 0)
+    return row
+
+
+def _score_rows(responses, threshold):
+    return [_score_row(response, threshold) for response in responses]
+
+
+# N x M matrix of fuzz.ratio scores between responses and candidate sentences (case-insensitive)
+# Scores below threshold are reported as 0; rows are spread over a process pool for large inputs
+def similarity_matrix(responses, candidates, threshold=0, workers=None, chunk_size=64):
+    responses = [response.lower() for response in responses]
+    candidates = [candidate.lower() for candidate in candidates]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(responses) * len(candidates) < PARALLEL_MIN_PAIRS:
+        _set_candidates(candidates)
+        return _score_rows(responses, threshold)
+
+    chunks = [responses[i:i + chunk_size] for i in range(0, len(responses), chunk_size)]
+    matrix = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_set_candidates, initargs=(candidates,)) as executor:
+        for rows in executor.map(_score_rows, chunks, [threshold] * len(chunks)):
+            matrix.extend(rows)
+    return matrix
+
+
+# For each response, the index and score of the most similar candidate (None if none reaches threshold)
+def best_matches(responses, candidates, threshold=0, workers=None):
+    matches = []
+    for row in similarity_matrix(responses, candidates, threshold, workers):
+        best_index = max(range(len(row)), key=row.__getitem__, default=None)
+        if best_index is None or row[best_index] == 0:
+            matches.append((None, 0))
+        else:
+            matches.append((best_index, row[best_index]))
+    return matches
+
+
+# Time the current per-pair are_strings_similar loop against similarity_matrix on the same inputs
+def run_benchmark(sentences_file, responses_count, candidates_count, threshold, workers):
+    from Dyslexia import are_strings_similar, read_sentences_from_file
+
+    rng = random.Random(0)
+    sentences = read_sentences_from_file(sentences_file)
+    candidates = [rng.choice(sentences) for _ in range(candidates_count)]
+    responses = []
+    for _ in range(responses_count):
+        letters = list(rng.choice(sentences))
+        for _ in range(3):
+            i = rng.randrange(len(letters) - 1)
+            letters[i], letters[i + 1] = letters[i + 1], letters[i]
+        responses.append("".join(letters))
+
+    start = time.perf_counter()
+    loop_result = [[are_strings_similar(response, candidate, threshold) for candidate in candidates] for response in responses]
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = similarity_matrix(responses, candidates, threshold, workers)
+    matrix_seconds = time.perf_counter() - start
+
+    pairs = responses_count * candidates_count
+    mismatches = sum(similar != (score >= threshold)
+                     for loop_row, row in zip(loop_result, matrix) for similar, score in zip(loop_row, row))
+    print(f"{pairs} pairs, threshold {threshold}, {mismatches} mismatches")
+    print(f"Per-pair loop:     {loop_seconds:.3f}s ({pairs / loop_seconds:.0f} pairs/s)")
+    print(f"similarity_matrix: {matrix_seconds:.3f}s ({pairs / matrix_seconds:.0f} pairs/s, "
+          f"{loop_seconds / matrix_seconds:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched response/sentence similarity scoring.")
+    parser.add_argument("--sentences", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "sentences.txt"))
+    parser.add_argument("--responses", type=int, default=500)
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--threshold", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    run_benchmark(args.sentences, args.responses, args.candidates, args.threshold, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Token-level alignment of a response against its target sentence.
+#
+# myers_distance computes the exact edit distance d between two token sequences with Myers'
+# bit-parallel algorithm (one pass, a handful of integer operations per token). An optimal
+# alignment never leaves the diagonal band |i - j| <= d, so align_tokens only fills that band
+# of the DP table and traces the alignment back from it: O(n * d) instead of O(n * m).
+
+
+# Edit distance between two sequences using Myers' bit-parallel algorithm
+def myers_distance(pattern, text):
+    m = len(pattern)
+    if m == 0:
+        return len(text)
+
+    # Bitmask of the positions each symbol occupies in the pattern
+    peq = {}
+    for i, symbol in enumerate(pattern):
+        peq[symbol] = peq.get(symbol, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    high_bit = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for symbol in text:
+        eq = peq.get(symbol, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high_bit:
+            score += 1
+        elif mh & high_bit:
+            score -= 1
+        # Global alignment: the top row grows by one per text symbol, so shift in a +1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+# Align response tokens to target tokens; returns one (response_index, target_index) pair per
+# alignment column, with None on the side that has a gap (inserted or missing word)
+def align_tokens(response_tokens, target_tokens, band=None):
+    n, m = len(response_tokens), len(target_tokens)
+    if band is None:
+        band = myers_distance(target_tokens, response_tokens)
+    band = max(band, abs(n - m))
+    width = 2 * band + 1
+    infinity = n + m + 1
+
+    # cost[i][k] holds D[i][j] for j = i - band + k; moves[i][k] records how that cell was reached
+    cost = [[infinity] * width for _ in range(n + 1)]
+    moves = [[None] * width for _ in range(n + 1)]
+    for i in range(n + 1):
+        for j in range(max(0, i - band), min(m, i + band) + 1):
+            k = j - i + band
+            if i == 0 and j == 0:
+                cost[i][k] = 0
+                continue
+            best, move = infinity, None
+            if i > 0 and j > 0:
+                substitution = 0 if response_tokens[i - 1] == target_tokens[j - 1] else 1
+                best, move = cost[i - 1][k] + substitution, "diagonal"
+            if i > 0 and k + 1 < width and cost[i - 1][k + 1] + 1 < best:
+                best, move = cost[i - 1][k + 1] + 1, "insert"
+            if j > 0 and k > 0 and cost[i][k - 1] + 1 < best:
+                best, move = cost[i][k - 1] + 1, "delete"
+            cost[i][k], moves[i][k] = best, move
+
+    pairs = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        move = moves[i][j - i + band]
+        if move == "diagonal":
+            i, j = i - 1, j - 1
+            pairs.append((i, j))
+        elif move == "insert":
+            i -= 1
+            pairs.append((i, None))
+        else:
+            j -= 1
+            pairs.append((None, j))
+    pairs.reverse()
+    return pairs
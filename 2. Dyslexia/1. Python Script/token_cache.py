@@ -0,0 +1,101 @@
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+CACHE_FILE_VERSION = 1
+
+
+class TokenScoreCache:
+    """Bounded LRU cache of per-token scores with hit/miss/eviction counters.
+
+    Keys are (token, aligned target word, rule-set version) tuples, so entries computed under an
+    older vocabulary or confusion lexicon are never served. If a path is given, entries for the
+    current rule-set version can be saved there and loaded again by the next run.
+    """
+
+    def __init__(self, maxsize=100000, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Return the cached value for key, or None on a miss
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    # Load entries saved by a previous run, keeping only those for the given rule-set version;
+    # returns how many entries the cache now holds (at most maxsize)
+    def load(self, version):
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, "rb") as file:
+                saved = pickle.load(file)
+        except Exception as e:
+            print(f"Ignoring token score cache '{self.path}': {e}")
+            return 0
+        if saved.get("format") != CACHE_FILE_VERSION or saved.get("version") != version:
+            return 0
+        for (token, target_word), value in saved["entries"]:
+            self.put((token, target_word, version), value)
+        return len(self._entries)
+
+    # Save the most recently used entries for the given rule-set version
+    def save(self, version):
+        if not self.path:
+            return
+        with self._lock:
+            entries = [((token, target_word), value) for (token, target_word, key_version), value in self._entries.items()
+                       if key_version == version]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump({"format": CACHE_FILE_VERSION, "version": version, "entries": entries}, file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,143 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# Artifact layout (little-endian):
+#   header  - magic, format version, word count, blob length
+#   offsets - (count + 1) uint32 start offsets into the blob
+#   blob    - the sorted, lower-cased UTF-8 words concatenated together
+VOCAB_MAGIC = b"DYSVOCAB"
+VOCAB_FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQ")
+
+# Default artifact location, next to this script
+VOCAB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"english_vocab.v{VOCAB_FORMAT_VERSION}.bin")
+
+
+# Write a vocabulary artifact from an iterable of words
+def build_vocab_artifact(words, path=VOCAB_PATH):
+    encoded = sorted({w.lower().encode("utf-8") for w in words if w})
+    offsets = array("I", [0])
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+
+    blob = b"".join(encoded)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(HEADER.pack(VOCAB_MAGIC, VOCAB_FORMAT_VERSION, len(encoded), len(blob)))
+        file.write(offsets.tobytes())
+        file.write(blob)
+    # Replace atomically so running workers never map a half-written file
+    os.replace(tmp_path, path)
+    return len(encoded)
+
+
+# Build the artifact from NLTK's English word list (the only step that needs nltk or the network)
+def build_vocab_from_nltk(path=VOCAB_PATH):
+    import nltk
+    try:
+        nltk.data.find('corpora/words')
+    except LookupError:
+        nltk.download('words')
+    from nltk.corpus import words as nltk_words
+    return build_vocab_artifact(nltk_words.words(), path)
+
+
+class VocabStore:
+    """Read-only, memory-mapped word set queried by binary search."""
+
+    def __init__(self, path=VOCAB_PATH):
+        self.path = path
+        with open(path, "rb") as file:
+            # The mapping is shared through the OS page cache by every process that opens the file
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, blob_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != VOCAB_MAGIC:
+            raise ValueError(f"'{path}' is not a vocabulary artifact.")
+        if version != VOCAB_FORMAT_VERSION:
+            raise ValueError(f"'{path}' has format version {version}, expected {VOCAB_FORMAT_VERSION}.")
+
+        self._count = count
+        offsets_start = HEADER.size
+        self._blob_start = offsets_start + 4 * (count + 1)
+        if len(self._mmap) != self._blob_start + blob_length:
+            raise ValueError(f"'{path}' is truncated or corrupt.")
+
+        if sys.byteorder == "little":
+            self._offsets = memoryview(self._mmap)[offsets_start:self._blob_start].cast("I")
+        else:
+            self._offsets = array("I", self._mmap[offsets_start:self._blob_start])
+            self._offsets.byteswap()
+
+    def __len__(self):
+        return self._count
+
+    def _word_at(self, index):
+        start = self._blob_start + self._offsets[index]
+        end = self._blob_start + self._offsets[index + 1]
+        return self._mmap[start:end]
+
+    def __contains__(self, word):
+        key = word.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            candidate = self._word_at(mid)
+            if candidate < key:
+                low = mid + 1
+            elif candidate > key:
+                high = mid
+            else:
+                return True
+        return False
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._word_at(index).decode("utf-8")
+
+    def close(self):
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._mmap.close()
+
+
+# Open the vocabulary artifact, building it from NLTK first if it is missing or outdated
+def load_vocab(path=VOCAB_PATH):
+    if os.path.exists(path):
+        try:
+            return VocabStore(path)
+        except ValueError as e:
+            print(f"Rebuilding vocabulary: {e}")
+    build_vocab_from_nltk(path)
+    return VocabStore(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the memory-mapped English vocabulary.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Build the artifact from NLTK's word list (run once, offline afterwards).")
+    build_parser.add_argument("--output", default=VOCAB_PATH)
+
+    lookup_parser = subparsers.add_parser("lookup", help="Check whether words are in the vocabulary.")
+    lookup_parser.add_argument("words", nargs="+")
+    lookup_parser.add_argument("--vocab", default=VOCAB_PATH)
+
+    args = parser.parse_args()
+    if args.command == "build":
+        count = build_vocab_from_nltk(args.output)
+        print(f"Wrote {count} words to '{args.output}'.")
+    else:
+        vocab = VocabStore(args.vocab)
+        for word in args.words:
+            print(f"{word}: {'yes' if word.lower() in vocab else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
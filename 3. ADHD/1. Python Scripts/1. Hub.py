@@ -1,7 +1,8 @@
 import webbrowser
 import time
-import subprocess
-import sys
+from session_orchestrator import DONE_STATES, FINISHED, RUNNING, SessionOrchestrator
+
+PROGRESS_INTERVAL_SECONDS = 30  # How often a running session prints its progress
 
 # Define the video links for each subject
 video_links = {
@@ -30,13 +31,29 @@ def open_video(selected_subject):
     else:
         print(f"Sorry, we don't have a video for {selected_subject}.")
 
-# Function to run ADHD.py in a separate process
-def run_adhd_script():
+# Print session lifecycle changes, and the progress of a running session every PROGRESS_INTERVAL_SECONDS
+last_progress_report = {}
+
+def report_session_event(job):
+    if job.state == RUNNING:
+        if time.time() - last_progress_report.get(job.id, 0) < PROGRESS_INTERVAL_SECONDS:
+            return
+        last_progress_report[job.id] = time.time()
+    print(f"Hub: {job.describe()}")
+    if job.state == FINISHED:
+        print(f"Hub: report saved to '{job.result['report']}'")
+
+# Wait for every queued session; Ctrl+C cancels them
+def wait_for_sessions(orchestrator, jobs):
     try:
-        python_executable = sys.executable
-        subprocess.run([python_executable, "ADHD.py"])
-    except Exception as e:
-        print(f"Error running ADHD.py: {e}")
+        for job in jobs:
+            while not job.wait(0.5):
+                pass
+    except KeyboardInterrupt:
+        print("Hub: cancelling sessions...")
+        orchestrator.cancel_all()
+        for job in jobs:
+            job.wait()
 
 # Display the list of subjects for the user to choose from
 def display_subjects():
@@ -46,25 +63,30 @@ def display_subjects():
 
 # Main program logic
 def main():
+    # Start importing the ADHD modules in the background while the user chooses
+    orchestrator = SessionOrchestrator(on_event=report_session_event)
     display_subjects()
 
     while True:
         try:
-            choice = int(input("Enter the number corresponding to your choice: "))
+            entry = input("Enter the number corresponding to your choice (several, e.g. 1,4, run back to back): ")
+            choices = [int(part) for part in entry.replace(",", " ").split()]
             subjects = list(video_links.keys())
-            if 1 <= choice <= len(subjects):
-                selected_subject = subjects[choice - 1]
-                open_video(selected_subject)
-
-                # Run ADHD.py in a separate process
-                run_adhd_script()
-                time.sleep(30)  # Wait for 30 seconds
-
+            if choices and all(1 <= choice <= len(subjects) for choice in choices):
+                # Each session opens its subject's video just before it starts recording
+                jobs = [orchestrator.submit(subjects[choice - 1], on_start=lambda job: open_video(job.subject))
+                        for choice in choices]
+                wait_for_sessions(orchestrator, jobs)
                 break
             else:
                 print("Invalid choice. Please enter a valid number.")
         except ValueError:
             print("Invalid input. Please enter a number.")
 
+    orchestrator.shutdown()
+    failed = [job for job in orchestrator.jobs() if job.state in DONE_STATES and job.state != FINISHED]
+    if failed:
+        print(f"Hub: {len(failed)} session(s) did not complete.")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
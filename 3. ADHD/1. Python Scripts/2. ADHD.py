@@ -1,153 +1,294 @@
+import argparse
+import io
+import os
+import sys
+import threading
 import time
-from pynput import keyboard
-from pynput.mouse import Listener as MouseListener
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-import matplotlib.pyplot as plt
+
+# Shared helpers live in "5. Common" at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "5. Common"))
+from lazy_import import lazy_import, preload
+import report_renderer
+
+from event_store import EventStore, KEY_PRESS, MOUSE_MOVE, MOUSE_PRESS, MOUSE_RELEASE
+from event_ingest import EventIngestor
+from fidget_detector import FidgetDetector
+from mouse_kinematics import MoveSampler, kinematic_summary
+from session_log import Session, SessionWriter
+import session_export
+
+# Report-only modules (matplotlib, reportlab) are imported when the first report is written
+timeline_renderer = lazy_import("timeline_renderer")
 
 # Constants for configuration
 MOUSE_MOVEMENT_THRESHOLD = 2  # Minimum horizontal mouse movement to be recorded as "left to right" movement
 PROGRAM_DURATION_SECONDS = 300  # Duration in seconds to run the program
 ADHD_WARNING_THRESHOLD = 5  # Number of fidgeting intervals to trigger a warning
+ACTIVITY_CAPACITY = None  # Keep only the most recent N events (ring buffer); None keeps the whole session
+INGEST_QUEUE_SIZE = 65536  # Events that may wait for the consumer thread before new ones are dropped
+STOP_WHEN_ASSESSED = False  # End the session early as soon as the live assessment flags signs of ADHD
+REPORT_PATH = 'user_activity_report.pdf'
+PLOT_PATH = 'user_activity.png'
+SESSION_LOG_PATH = 'session.adhdlog'  # Binary log of every captured input event, for replay; None disables it
+METRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'adhd_metrics')  # Column tables every reported session is appended to (metrics, intervals, events); None disables them
+MOVE_SAMPLE_MIN_INTERVAL = 0.01  # Shortest time between two recorded mouse move samples (seconds)
+MOVE_SAMPLE_MIN_DISTANCE = 3  # Pixels the pointer must travel (or reverse direction) before a new sample
+MOVE_SAMPLE_MAX_INTERVAL = 0.1  # Slow pointer drift is still sampled this often (seconds)
+
+# Constants for fidget detection
+MIN_FIDGET_ACTIONS = 2  # Minimum number of fidgeting actions to constitute an interval
+FIDGET_MAX_GAP_SECONDS = 1.0  # Longest pause between actions within one fidgeting interval
+KEY_BURST_MIN_PRESSES = 3  # Same key pressed this many times in a row counts as a burst
+CLICK_BURST_MIN_CLICKS = 4  # This many clicks within CLICK_BURST_WINDOW_SECONDS count as a burst
+CLICK_BURST_WINDOW_SECONDS = 2.0
+
+# Assessment thresholds (exceeding any one of them flags possible ADHD)
+ADHD_BURST_THRESHOLD = 5
+ADHD_FIDGET_TIME_THRESHOLD = 10  # Seconds
+ADHD_FIDGET_COUNT_THRESHOLD = 10
 
 # Variables to store user activity and ADHD-related data
-activity = []  # Stores (timestamp, action) pairs
+activity = EventStore(ACTIVITY_CAPACITY)  # Stores (timestamp, event code, key, x, y) columns
 fidget_intervals = []  # Stores (start_time, end_time) of fidgeting intervals
 fidget_count = 0  # Count of fidgeting intervals
 last_mouse_x = None  # Variable to track the last mouse position
 adhd_warning_triggered = False  # Flag to track if the warning has been triggered
 burst_count = 0  # Count of bursts of activity
-consecutive_bursts = 0
-consecutive_actions = 0
-last_action = None
 start_time = 0
-consecutive_key_presses = 0
+session_log = None  # SessionWriter for the session being captured
+pointer_trace = EventStore(ACTIVITY_CAPACITY)  # Every mouse move sample, for kinematic features
+pointer_features = {}  # Session-level pointer kinematics, see mouse_kinematics.KINEMATIC_FIELDS
 
-def on_click(x, y, button, pressed):
-    """Handle mouse input."""
-    timestamp = time.time()
-    action = "Mouse Press" if pressed else "Mouse Release"
-    activity.append((timestamp, action))
-    print(action)
 
-    global burst_count, last_action, consecutive_bursts
+def new_fidget_detector():
+    """Create a detector configured with this script's thresholds."""
+    return FidgetDetector(
+        min_actions=MIN_FIDGET_ACTIONS, max_gap=FIDGET_MAX_GAP_SECONDS,
+        key_burst_min=KEY_BURST_MIN_PRESSES, click_burst_min=CLICK_BURST_MIN_CLICKS,
+        burst_window=CLICK_BURST_WINDOW_SECONDS, burst_threshold=ADHD_BURST_THRESHOLD,
+        fidget_time_threshold=ADHD_FIDGET_TIME_THRESHOLD, fidget_count_threshold=ADHD_FIDGET_COUNT_THRESHOLD)
 
-    if action == "Mouse Release" and last_action == "Mouse Press":
-        consecutive_bursts += 1
-    else:
-        consecutive_bursts = 0
+detector = new_fidget_detector()  # Live fidget, burst and assessment state, updated as events arrive
 
-    last_action = action
+def new_move_sampler():
+    """Create a mouse move sampler configured with this script's settings."""
+    return MoveSampler(min_interval=MOVE_SAMPLE_MIN_INTERVAL, min_distance=MOVE_SAMPLE_MIN_DISTANCE,
+                       max_interval=MOVE_SAMPLE_MAX_INTERVAL)
 
-    if consecutive_bursts >= 4:
-        burst_count += 1
-        if burst_count == 4:
-            print(f"Burst Detected: {burst_count} bursts")
-            burst_count = 0
+move_sampler = new_move_sampler()  # Coalesces OS mouse move events on the listener thread
 
-def on_key_press(key):
-    """Handle keyboard input."""
-    timestamp = time.time()
-    action = f"Key Press: {key}"
-    activity.append((timestamp, action))
-    print(action)
+def on_click(x, y, button, pressed):
+    """Handle mouse input (listener thread: only queue the event)."""
+    ingestor.push(time.time(), MOUSE_PRESS if pressed else MOUSE_RELEASE, button, x, y)
 
-    global burst_count, consecutive_actions, last_action, consecutive_key_presses
+def on_key_press(key):
+    """Handle keyboard input (listener thread: only queue the event)."""
+    ingestor.push(time.time(), KEY_PRESS, key)
 
-    if action == last_action:
-        consecutive_actions += 1
+def on_mouse_move(x, y):
+    """Handle mouse movement (listener thread: queue only the moves the sampler keeps)."""
+    for timestamp, sample_x, sample_y in move_sampler.offer(time.time(), x, y):
+        ingestor.push(timestamp, MOUSE_MOVE, None, sample_x, sample_y)
+
+def handle_event(timestamp, code, key, x, y):
+    """Record a queued event and update burst bookkeeping (consumer thread)."""
+    if session_log is not None:
+        session_log.write(timestamp, code, key, x, y)
+    if code == KEY_PRESS:
+        record_key_press(timestamp, key)
+    elif code == MOUSE_MOVE:
+        record_mouse_move(timestamp, x, y)
     else:
-        consecutive_actions = 1
-
-    if consecutive_actions >= 3:
-        burst_count += 1
-        print(f"Burst Detected: {burst_count} bursts")
-        consecutive_actions = 0
+        record_click(timestamp, code, key, x, y)
 
-    last_action = action
+def record_click(timestamp, code, button, x, y):
+    """Handle mouse input."""
+    button_id = activity.key_id(str(button))
+    activity.append(timestamp, code, button_id, x, y)
+    if detector.update(timestamp, code, button_id):
+        ingestor.log(f"Burst Detected: {detector.burst_count} bursts")
 
+def record_key_press(timestamp, key):
+    """Handle keyboard input."""
+    key_id = activity.key_id(str(key))
+    activity.append(timestamp, KEY_PRESS, key_id)
+    if detector.update(timestamp, KEY_PRESS, key_id):
+        ingestor.log(f"Burst Detected: {detector.burst_count} bursts")
 
-def on_mouse_move(x, y):
+def record_mouse_move(timestamp, x, y):
     """Handle mouse movement."""
     global last_mouse_x
+    pointer_trace.append(timestamp, MOUSE_MOVE, 0, x, y)
     if last_mouse_x is None:
         last_mouse_x = x
         return
     mouse_movement = abs(x - last_mouse_x)
     if mouse_movement >= MOUSE_MOVEMENT_THRESHOLD:
-        timestamp = time.time()
-        action = f"Mouse Move: {last_mouse_x} to {x}"
-        activity.append((timestamp, action))
+        activity.append(timestamp, MOUSE_MOVE, 0, x, y)
+        detector.update(timestamp, MOUSE_MOVE)
         last_mouse_x = x
-        print(action)
-
-def detect_fidget_intervals():
-    """Fidget Intervals."""
-    global fidget_count, fidget_intervals, activity
-    fidget_start_time = None
-    fidget_action_count = 0
-
-    for timestamp, action in activity:
-        # Define your criteria for fidgeting actions here
-        if is_fidgeting_action(action):
-            if fidget_start_time is None:
-                fidget_start_time = timestamp
-            fidget_action_count += 1
-        else:
-            if fidget_start_time is not None:
-                if fidget_action_count >= MIN_FIDGET_ACTIONS:
-                    fidget_intervals.append((fidget_start_time, timestamp))
-                    fidget_count += 1
-                fidget_start_time = None
-                fidget_action_count = 0
-
-    # Check if the last interval is a fidgeting interval
-    if fidget_start_time is not None and fidget_action_count >= MIN_FIDGET_ACTIONS:
-        fidget_intervals.append((fidget_start_time, timestamp))
-        fidget_count += 1
-
-def is_fidgeting_action(action):
-    fidget_keywords = ["Mouse Press", "Mouse Release", "Key Press", "Mouse Move"]
-    return action in fidget_keywords
-
-
-# Constants for fidget detection
-MIN_FIDGET_ACTIONS = 2  # Minimum number of fidgeting actions to constitute an interval
-
-def create_pdf_report():
-    """Create a PDF report."""
-    c = canvas.Canvas('user_activity_report.pdf', pagesize=letter)
-    width, height = letter
-
-    c.setFont("Helvetica", 14)
-    c.drawString(100, height - 50, "User Activity Report")
 
+# Listener callbacks hand events to this ingestor; its consumer thread calls handle_event
+ingestor = EventIngestor(handle_event, max_pending=INGEST_QUEUE_SIZE)
+
+def detect_fidget_intervals(session_detector=None):
+    """Fidget Intervals: take the results of a detector, or replay the recorded activity through a new one."""
+    global fidget_count, fidget_intervals, burst_count
+    if session_detector is None:
+        session_detector = new_fidget_detector()
+        columns = activity.to_numpy()
+        session_detector.update_many(columns["timestamp"].tolist(), columns["code"].tolist(), columns["key"].tolist())
+    session_detector.finish()
+
+    fidget_intervals = session_detector.intervals()
+    fidget_count = len(fidget_intervals)
+    burst_count = session_detector.burst_count
+
+def analyze_pointer_kinematics():
+    """Velocity, jerk, direction changes and idle time of the pointer over the session."""
+    global pointer_features
+    columns = pointer_trace.to_numpy()
+    pointer_features = kinematic_summary(columns["timestamp"], columns["x"], columns["y"])
+
+def reset_session():
+    """Clear the activity and detection state left by a previous session."""
+    global activity, detector, fidget_intervals, fidget_count, last_mouse_x, adhd_warning_triggered, burst_count
+    global pointer_trace, pointer_features, move_sampler, ingestor
+    activity = EventStore(ACTIVITY_CAPACITY)
+    ingestor = EventIngestor(handle_event, max_pending=INGEST_QUEUE_SIZE)
+    pointer_trace = EventStore(ACTIVITY_CAPACITY)
+    pointer_features = {}
+    move_sampler = new_move_sampler()
+    detector = new_fidget_detector()
+    fidget_intervals = []
+    fidget_count = 0
+    last_mouse_x = None
+    adhd_warning_triggered = False
+    burst_count = 0
+
+def replay_session(path, speed=None, report=True, output_dir='.'):
+    """Feed a recorded session log through the same analysis path as live capture.
+
+    With speed=None events are replayed as fast as possible; otherwise the original timing is
+    reproduced speed times faster. No display or input devices are needed.
+    """
+    global start_time
+    session = Session(path)
+    reset_session()
+    start_time = session.start_time
+    replay_start = time.perf_counter()
+    first_timestamp = None
+    for event in session.events():
+        if speed:
+            if first_timestamp is None:
+                first_timestamp = event[0]
+            delay = (event[0] - first_timestamp) / speed - (time.perf_counter() - replay_start)
+            if delay > 0:
+                time.sleep(delay)
+        handle_event(*event)
+    ingestor.flush_log()
+    elapsed = time.perf_counter() - replay_start
+    print(f"Logger: replayed {len(session)} events ({session.duration:.1f}s of activity) in {elapsed:.2f}s")
+
+    detect_fidget_intervals(detector)
+    analyze_pointer_kinematics()
+    if report:
+        write_reports(output_dir)
+        export_session_metrics(path)
+    return dict(detector.snapshot(), **pointer_features)
+
+def write_reports(output_dir='.', wait=True):
+    """Save the activity plot into output_dir and render the PDF report on the report service.
+
+    The plot is rendered once in memory and used for both. Returns a future of the report's path;
+    with wait=True it has already completed.
+    """
+    image = render_activity_plot()
+    with open(os.path.join(output_dir, PLOT_PATH), "wb") as file:
+        file.write(image)
+    print("Saving PDF report...")
+    report = create_pdf_report(os.path.join(output_dir, REPORT_PATH), image)
+    if wait:
+        report.result()
+        print("PDF report saved.")
+    return report
+
+def export_session_metrics(session):
+    """Append the analyzed session to the column tables in METRICS_DIR, if enabled."""
+    if not METRICS_DIR:
+        return
+    snapshot = detector.snapshot()
+    row = dict(snapshot, **pointer_features, session=session, start_time=start_time,
+               duration_seconds=snapshot["elapsed_seconds"])
+    session_export.export_session(METRICS_DIR, row, fidget_intervals, activity.to_numpy(), activity.key_names)
+
+def build_report(activity_image):
+    """In-memory model of the report on the analyzed session."""
+    report = report_renderer.Report("User Activity Report")
     total_fidgeting_time = sum(end - start for start, end in fidget_intervals)
-    c.drawString(100, height - 100, f"Total fidgeting time: {total_fidgeting_time:.3f} seconds")
-    c.drawString(100, height - 120, f"Number of fidgeting intervals: {fidget_count}")
-    c.drawString(100, height - 140, f"Number of bursts of activity: {burst_count}")
-
-    if (burst_count > 5) or (total_fidgeting_time > 10) or (fidget_count > 10):
+    report.text(f"Total fidgeting time: {total_fidgeting_time:.3f} seconds", size=14)
+    report.text(f"Number of fidgeting intervals: {fidget_count}", size=14)
+    report.text(f"Number of bursts of activity: {burst_count}", size=14)
+    if pointer_features:
+        report.text(f"Pointer: {pointer_features['mean_speed']:.0f} px/s mean speed, "
+                    f"{pointer_features['direction_change_rate']:.2f} direction changes/s", size=14)
+
+    if ((burst_count > ADHD_BURST_THRESHOLD) or (total_fidgeting_time > ADHD_FIDGET_TIME_THRESHOLD)
+            or (fidget_count > ADHD_FIDGET_COUNT_THRESHOLD)):
         result_color = "red"
         assessment = "may have ADHD"
     else:
         result_color = "green"
         assessment = "doesn't have signs of ADHD"
-    c.setFillColor(result_color)
-    c.drawString(100, height - 180, f"The user {assessment}.")
-    graph_image_path = 'user_activity.png'
-    c.drawImage(graph_image_path, 100, height - 400, width=400, height=200)
-    c.save()
-
-
-# Main project Logic
-def main():
-    global  start_time   # Define start_time as a global variable
-
+    report.text(f"The user {assessment}.", color=result_color, size=14)
+    report.space(10)
+    report.image(activity_image, width=400, height=200)
+    return report
+
+def create_pdf_report(filename=REPORT_PATH, activity_image=None):
+    """Queue the PDF report on the background report service; returns a future of filename."""
+    if activity_image is None:
+        activity_image = render_activity_plot()
+    return report_renderer.default_service().submit(build_report(activity_image), filename)
+
+
+def render_activity_plot():
+    """Plot user activity over time; returns the PNG image as bytes."""
+    image = io.BytesIO()
+    timeline_renderer.render_activity_timeline(activity.to_numpy(), image, intervals=fidget_intervals)
+    return image.getvalue()
+
+def save_activity_plot(filename=PLOT_PATH):
+    """Plot user activity over time and save it as an image."""
+    timeline_renderer.render_activity_timeline(activity.to_numpy(), filename, intervals=fidget_intervals)
+
+def preload_report_modules():
+    """Import the report-only modules now rather than when the first report is written."""
+    preload(timeline_renderer, report_renderer.futures, report_renderer.canvas, report_renderer.pagesizes,
+            report_renderer.rl_utils)
+
+
+def run_session(duration=PROGRAM_DURATION_SECONDS, output_dir='.', cancel_event=None, on_progress=None, setup_seconds=2,
+                wait_for_report=True):
+    """Capture one session, then write its log, plot and PDF report into output_dir.
+
+    State left by an earlier session is cleared first, so sessions can run back to back in one
+    process. on_progress is called about once a second with the live assessment. Setting
+    cancel_event ends the capture early without writing a report. With wait_for_report=False the
+    PDF is still being rendered when this returns; result["pending_report"] is its future.
+    """
+    global start_time, session_log
+    from pynput import keyboard
+    from pynput.mouse import Listener as MouseListener
+
+    cancel_event = cancel_event or threading.Event()
+    reset_session()
+    os.makedirs(output_dir, exist_ok=True)
     start_time = time.time()  # Set the start_time when the program starts
 
     print("Logger: SETUP VIDEO TIME")
-    time.sleep(2)
+    if cancel_event.wait(setup_seconds):
+        return {"cancelled": True, "output_dir": output_dir}
     print("Logger: RECORDING INPUT")
 
     # Initialize keyboard listener and mouse movement listener
@@ -156,42 +297,74 @@ def main():
     # Initialize mouse listener to capture both click and move events
     mouse_listener = MouseListener(on_click=on_click, on_move=on_mouse_move)
 
-    # Start keyboard and mouse listeners
+    log_path = os.path.join(output_dir, SESSION_LOG_PATH) if SESSION_LOG_PATH else None
+    if log_path:
+        session_log = SessionWriter(log_path)
+
+    # Start the consumer thread, then the keyboard and mouse listeners
+    ingestor.start()
     keyboard_listener.start()
     mouse_listener.start()
 
     try:
         start_time = time.time()
-        while True:
-            if time.time() - start_time >= PROGRAM_DURATION_SECONDS:
+        while not cancel_event.is_set():
+            elapsed = time.time() - start_time
+            if elapsed >= duration:
+                break
+            snapshot = detector.snapshot()
+            if on_progress is not None:
+                on_progress(dict(snapshot, elapsed=elapsed, duration=duration))
+            if STOP_WHEN_ASSESSED and snapshot["adhd_suspected"]:
+                print("Logger: ASSESSMENT REACHED, ENDING SESSION EARLY")
                 break
-            time.sleep(1)
+            cancel_event.wait(1)
+            if session_log is not None:
+                session_log.flush()
     except KeyboardInterrupt:
         pass
 
     # Stop listeners when the program duration is over
     keyboard_listener.stop()
     mouse_listener.stop()
+    for timestamp, x, y in move_sampler.flush():
+        ingestor.push(timestamp, MOUSE_MOVE, None, x, y)
+    ingestor.stop()
+    if session_log is not None:
+        session_log.close()
+        session_log = None
+        print(f"Logger: session recorded to '{log_path}'")
+    stats = ingestor.stats()
+    print(f"Logger: {stats['processed']} events captured, {stats['dropped']} dropped, {stats['errors']} failed, peak backlog {stats['max_backlog']}")
+    print(f"Logger: {move_sampler.received} mouse moves sampled down to {move_sampler.emitted}")
+
+    # Collect the fidgeting intervals and bursts tracked live during the session
+    detect_fidget_intervals(detector)
+    analyze_pointer_kinematics()
+    result = dict(detector.snapshot(), **pointer_features, cancelled=cancel_event.is_set(), output_dir=output_dir,
+                  session_log=log_path)
+    if result["cancelled"]:
+        print("Logger: SESSION CANCELLED, NO REPORT WRITTEN")
+        return result
+
+    # Create and save the graph image and the PDF report, and add the session to the metrics tables
+    report = write_reports(output_dir, wait=wait_for_report)
+    export_session_metrics(log_path or output_dir)
+    result["report"] = os.path.join(output_dir, REPORT_PATH)
+    if not wait_for_report:
+        result["pending_report"] = report
+    return result
 
-    # Detect fidgeting intervals
-    detect_fidget_intervals()
-
-    # Create and save the graph image
-    timestamps, actions = zip(*activity)
-    plt.figure(figsize=(10, 6))
-    for i in range(1, len(timestamps)):
-        plt.plot([timestamps[i - 1], timestamps[i]], [i - 1, i], 'b-')
-
-    plt.yticks(range(len(timestamps)), actions, fontsize=8)
-    plt.xlabel('Timestamp')
-    plt.title('User Activity Over Time')
-    plt.tight_layout()
-    plt.savefig('user_activity.png')
-
-    # Create and save the PDF report
-    print("Saving PDF report...")
-    create_pdf_report()
-    print("PDF report saved.")
+# Main project Logic
+def main():
+    run_session()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Capture a session, or analyze a recorded one.")
+    parser.add_argument("--replay", metavar="LOG", help="Analyze a recorded session log instead of capturing input")
+    parser.add_argument("--speed", type=float, help="Replay at this multiple of real time (default: as fast as possible)")
+    args = parser.parse_args()
+    if args.replay:
+        replay_session(args.replay, args.speed)
+    else:
+        main()
\ No newline at end of file
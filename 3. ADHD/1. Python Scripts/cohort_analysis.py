@@ -0,0 +1,276 @@
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Shared helpers live in "5. Common" at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "5. Common"))
+
+import session_export
+from event_store import KEY_PRESS, MOUSE_MOVE, MOUSE_PRESS, MOUSE_RELEASE
+from mouse_kinematics import KINEMATIC_FIELDS, kinematic_summary
+from session_log import Session
+
+ADHD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "2. ADHD.py")
+SESSION_SUFFIX = ".adhdlog"
+
+# Per-session columns of the cohort table
+TABLE_FIELDS = ("session", "start_time", "events", "duration_seconds", "fidget_count", "total_fidget_time", "burst_count",
+                "adhd_suspected") + KINEMATIC_FIELDS + ("error",)
+# Metrics summarized across the cohort
+DISTRIBUTION_FIELDS = ("events", "duration_seconds", "fidget_count", "total_fidget_time", "burst_count") + KINEMATIC_FIELDS
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_BINS = 10
+
+# Same values as the constants in 2. ADHD.py; load_settings() reads the script's current ones
+DEFAULT_SETTINGS = {
+    "move_threshold": 2,
+    "min_actions": 2,
+    "max_gap": 1.0,
+    "key_burst_min": 3,
+    "click_burst_min": 4,
+    "burst_window": 2.0,
+    "burst_threshold": 5,
+    "fidget_time_threshold": 10,
+    "fidget_count_threshold": 10,
+    "fidget_codes": (MOUSE_PRESS, MOUSE_RELEASE, KEY_PRESS, MOUSE_MOVE),
+}
+
+
+# Detection thresholds as configured in 2. ADHD.py
+def load_settings():
+    spec = importlib.util.spec_from_file_location("ADHD", ADHD_PATH)
+    adhd = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(adhd)
+    return dict(DEFAULT_SETTINGS,
+                move_threshold=adhd.MOUSE_MOVEMENT_THRESHOLD, min_actions=adhd.MIN_FIDGET_ACTIONS,
+                max_gap=adhd.FIDGET_MAX_GAP_SECONDS, key_burst_min=adhd.KEY_BURST_MIN_PRESSES,
+                click_burst_min=adhd.CLICK_BURST_MIN_CLICKS, burst_window=adhd.CLICK_BURST_WINDOW_SECONDS,
+                burst_threshold=adhd.ADHD_BURST_THRESHOLD, fidget_time_threshold=adhd.ADHD_FIDGET_TIME_THRESHOLD,
+                fidget_count_threshold=adhd.ADHD_FIDGET_COUNT_THRESHOLD)
+
+
+# Mouse moves that record_mouse_move would keep. The reference position only advances on kept
+# moves, so this is the one sequential pass; it runs over the x column alone.
+def kept_moves(xs, threshold):
+    keep = np.zeros(len(xs), dtype=bool)
+    if len(xs) == 0:
+        return keep
+    xs = xs.tolist()
+    last_x = xs[0]  # The first move only sets the reference position
+    for i in range(1, len(xs)):
+        if abs(xs[i] - last_x) >= threshold:
+            keep[i] = True
+            last_x = xs[i]
+    return keep
+
+
+# (starts, ends) of the fidget intervals FidgetDetector would report for these events
+def fidget_intervals(timestamps, codes, settings):
+    count = len(timestamps)
+    if count == 0:
+        return timestamps[:0], timestamps[:0]
+    is_fidget = np.isin(codes, settings["fidget_codes"])
+    breaks = np.ones(count, dtype=bool)  # True where a new run starts
+    breaks[1:] = (np.diff(timestamps) > settings["max_gap"]) | ~is_fidget[1:] | ~is_fidget[:-1]
+    starts = np.flatnonzero(breaks)
+    ends = np.append(starts[1:], count) - 1
+    qualifies = is_fidget[starts] & (ends - starts + 1 >= settings["min_actions"])
+    return timestamps[starts[qualifies]], timestamps[ends[qualifies]]
+
+
+# Key bursts (same key key_burst_min times in a row, clicks break the run) plus click bursts
+def count_bursts(timestamps, codes, keys, settings):
+    is_button = (codes == KEY_PRESS) | (codes == MOUSE_PRESS) | (codes == MOUSE_RELEASE)
+    button_codes = codes[is_button]
+    is_key = button_codes == KEY_PRESS
+    run_keys = keys[is_button]
+    bursts = 0
+    if len(run_keys):
+        breaks = np.ones(len(run_keys), dtype=bool)
+        breaks[1:] = (run_keys[1:] != run_keys[:-1]) | ~is_key[1:] | ~is_key[:-1]
+        starts = np.flatnonzero(breaks)
+        lengths = np.diff(np.append(starts, len(run_keys)))
+        bursts += int((lengths[is_key[starts]] // settings["key_burst_min"]).sum())
+
+    # Clicks inside the window since the last click burst; the reset after a burst is sequential,
+    # but only presses are visited and each window start is found with one searchsorted
+    presses = timestamps[codes == MOUSE_PRESS]
+    window_starts = np.searchsorted(presses, presses - settings["burst_window"], side="left").tolist()
+    cleared = 0
+    for i, window_start in enumerate(window_starts):
+        if i - max(window_start, cleared) + 1 >= settings["click_burst_min"]:
+            bursts += 1
+            cleared = i + 1
+    return bursts
+
+
+# Per-session metrics equal to a replay through FidgetDetector, computed from the log's columns
+def session_metrics(columns, settings=DEFAULT_SETTINGS):
+    codes = columns["code"]
+    is_move = codes == MOUSE_MOVE
+    keep = ~is_move
+    keep[is_move] = kept_moves(columns["x"][is_move], settings["move_threshold"])
+    timestamps = columns["timestamp"][keep]
+    codes = codes[keep]
+    keys = columns["key"][keep]
+
+    starts, ends = fidget_intervals(timestamps, codes, settings)
+    fidget_count = len(starts)
+    total_fidget_time = float((ends - starts).sum())
+    burst_count = count_bursts(timestamps, codes, keys, settings)
+    return {
+        "events": int(len(timestamps)),
+        "duration_seconds": float(timestamps[-1] - timestamps[0]) if len(timestamps) else 0.0,
+        "fidget_count": fidget_count,
+        "total_fidget_time": total_fidget_time,
+        "burst_count": burst_count,
+        "adhd_suspected": (burst_count > settings["burst_threshold"]
+                           or total_fidget_time > settings["fidget_time_threshold"]
+                           or fidget_count > settings["fidget_count_threshold"]),
+    }
+
+
+# Analyze one session log; failures are reported in the row instead of aborting the cohort
+def analyze_session(path, settings=DEFAULT_SETTINGS):
+    row = {"session": path}
+    try:
+        session = Session(path)
+        columns = session.columns
+        row["start_time"] = session.start_time
+        row.update(session_metrics(columns, settings))
+        moves = columns["code"] == MOUSE_MOVE
+        row.update(kinematic_summary(columns["timestamp"][moves], columns["x"][moves], columns["y"][moves]))
+    except (OSError, ValueError) as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def _analyze_in_worker(args):
+    return analyze_session(*args)
+
+
+# Analyze every session, spreading them over a process pool; rows keep the order of paths
+def analyze_cohort(paths, settings=DEFAULT_SETTINGS, workers=None, chunk_size=None):
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        return [analyze_session(path, settings) for path in paths]
+    chunk_size = chunk_size or max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_analyze_in_worker, [(path, settings) for path in paths], chunksize=chunk_size))
+
+
+# Summary statistics and histogram of each metric over the sessions that were analyzed
+def cohort_distributions(rows):
+    rows = [row for row in rows if "error" not in row]
+    summary = {
+        "sessions": len(rows),
+        "adhd_suspected": sum(row["adhd_suspected"] for row in rows),
+        "metrics": {},
+    }
+    summary["adhd_suspected_rate"] = summary["adhd_suspected"] / len(rows) if rows else 0.0
+    for field in DISTRIBUTION_FIELDS:
+        values = np.array([row[field] for row in rows], dtype=np.float64)
+        if len(values) == 0:
+            continue
+        counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+        summary["metrics"][field] = {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "percentiles": dict(zip((f"p{p}" for p in PERCENTILES), np.percentile(values, PERCENTILES).tolist())),
+            "histogram": {"counts": counts.tolist(), "edges": edges.tolist()},
+        }
+    return summary
+
+
+# Session logs named on the command line; directories contribute every log inside them, including
+# the per-session folders the Hub writes
+def find_sessions(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, subfolders, names in os.walk(path):
+                subfolders.sort()
+                for name in sorted(names):
+                    if name.endswith(SESSION_SUFFIX):
+                        yield os.path.join(folder, name)
+        else:
+            yield path
+
+
+# Append the analyzed sessions to the sessions table in metrics_dir (intervals and events are only
+# exported by 2. ADHD.py); returns how many were added
+def export_rows(rows, metrics_dir):
+    rows = [row for row in rows if "error" not in row]
+    for row in rows:
+        session_export.export_session(metrics_dir, row)
+    return len(rows)
+
+
+def write_table(rows, path):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if path.endswith((".jsonl", ".ndjson")):
+            for row in rows:
+                file.write(json.dumps(row) + "\n")
+        else:
+            writer = csv.DictWriter(file, fieldnames=TABLE_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def print_summary(summary):
+    print(f"{summary['sessions']} sessions, {summary['adhd_suspected']} flagged "
+          f"({summary['adhd_suspected_rate']:.1%})")
+    print(f"{'metric':<22} {'mean':>10} {'p10':>10} {'p50':>10} {'p90':>10} {'max':>10}")
+    for field, stats in summary["metrics"].items():
+        percentiles = stats["percentiles"]
+        print(f"{field:<22} {stats['mean']:>10.2f} {percentiles['p10']:>10.2f} {percentiles['p50']:>10.2f} "
+              f"{percentiles['p90']:>10.2f} {stats['max']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a cohort of recorded ADHD sessions.")
+    parser.add_argument("sessions", nargs="*", help="Session logs, or directories containing them")
+    parser.add_argument("--from-table", metavar="DIR", help="Summarize the sessions already in this metrics directory "
+                                                             "(e.g. adhd_metrics) instead of analyzing logs")
+    parser.add_argument("--export", metavar="DIR", help="Append the analyzed sessions to the tables in this metrics directory")
+    parser.add_argument("--output", default="cohort.csv", help="Cohort table (.csv or .jsonl)")
+    parser.add_argument("--summary", help="Write the aggregate distributions to this JSON file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, help="Sessions handed to a worker at a time")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.from_table:
+        rows = session_export.session_rows(args.from_table)
+        print(f"Loaded {len(rows)} sessions from '{args.from_table}' in {time.perf_counter() - start:.2f}s.")
+    else:
+        paths = list(find_sessions(args.sessions))
+        if not paths:
+            sys.exit("No session logs found.")
+        rows = analyze_cohort(paths, load_settings(), args.workers, args.chunk_size)
+        errors = sum("error" in row for row in rows)
+        print(f"Analyzed {len(rows)} sessions in {time.perf_counter() - start:.2f}s with {args.workers} workers"
+              f"{f', {errors} failed' if errors else ''}.")
+        if args.export:
+            print(f"{export_rows(rows, args.export)} sessions added to '{args.export}'.")
+
+    write_table(rows, args.output)
+    print(f"Table written to '{args.output}'.")
+    summary = cohort_distributions(rows)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
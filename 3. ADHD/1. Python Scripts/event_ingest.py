@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import Counter, deque
+
+from event_store import EVENT_NAMES
+
+
+class EventIngestor:
+    """Moves event handling off the pynput listener threads.
+
+    Listener callbacks only call push(), which appends a raw tuple to a bounded deque (deque
+    appends and pops are atomic; a short lock only guards the counters shared by the keyboard
+    and mouse listeners). A consumer thread drains the queue in batches, passes each event to
+    the handler, and prints a rate-limited activity summary instead of one line per event.
+    Events arriving while the queue is full are dropped and counted rather than blocking the
+    listener. An event the handler fails on is counted and logged, and the consumer carries on.
+    """
+
+    def __init__(self, handler, max_pending=65536, drain_interval=0.05, log_interval=1.0):
+        self.handler = handler
+        self.max_pending = max_pending
+        self.drain_interval = drain_interval
+        self.log_interval = log_interval
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_backlog = 0
+        self._queue = deque()
+        self._count_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._log_messages = []
+        self._log_counts = Counter()
+        self._log_dropped = 0
+        self._last_log = 0.0
+
+    # Called on the listener threads: record the raw event and return immediately
+    def push(self, timestamp, code, key=None, x=0, y=0):
+        with self._count_lock:
+            self.received += 1
+            if len(self._queue) >= self.max_pending:
+                self.dropped += 1
+                return
+        self._queue.append((timestamp, code, key, x, y))
+
+    # Queue a message for the next rate-limited log flush (consumer thread only)
+    def log(self, message):
+        self._log_messages.append(message)
+
+    def start(self):
+        self._stop.clear()
+        self._last_log = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="event-ingest", daemon=True)
+        self._thread.start()
+
+    # Stop the consumer after it has handled every event already queued
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "pending": len(self._queue),
+            "max_backlog": self.max_backlog,
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.drain_interval):
+            self._drain()
+            if time.monotonic() - self._last_log >= self.log_interval:
+                self.flush_log()
+        self._drain()
+        self.flush_log()
+
+    def _drain(self):
+        queue = self._queue
+        self.max_backlog = max(self.max_backlog, len(queue))
+        while queue:
+            event = queue.popleft()
+            try:
+                self.handler(*event)
+            except Exception as e:
+                self.errors += 1
+                self.log(f"Error handling {EVENT_NAMES.get(event[1], event[1])} event: {type(e).__name__}: {e}")
+            self.processed += 1
+            self._log_counts[event[1]] += 1
+
+    # Print the activity summary and queued messages (consumer thread, or the caller once it has stopped)
+    def flush_log(self):
+        self._last_log = time.monotonic()
+        dropped = self.dropped - self._log_dropped
+        if self._log_counts or dropped:
+            counts = ", ".join(f"{count} {EVENT_NAMES.get(code, code)}" for code, count in sorted(self._log_counts.items()))
+            summary = f"Logger: {counts or 'no events'}"
+            if dropped:
+                summary += f" ({dropped} dropped)"
+            print(summary)
+        for message, count in Counter(self._log_messages).items():
+            print(message if count == 1 else f"{message} (x{count})")
+        self._log_counts.clear()
+        self._log_messages.clear()
+        self._log_dropped = self.dropped
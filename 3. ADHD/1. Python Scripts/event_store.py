@@ -0,0 +1,114 @@
+from array import array
+
+import numpy as np
+
+# Event codes stored in the code column
+MOUSE_PRESS = 1
+MOUSE_RELEASE = 2
+KEY_PRESS = 3
+MOUSE_MOVE = 4
+
+EVENT_NAMES = {
+    MOUSE_PRESS: "Mouse Press",
+    MOUSE_RELEASE: "Mouse Release",
+    KEY_PRESS: "Key Press",
+    MOUSE_MOVE: "Mouse Move",
+}
+
+# Typecode and NumPy dtype of each column
+COLUMNS = (
+    ("timestamp", "d", np.float64),
+    ("code", "B", np.uint8),
+    ("key", "i", np.int32),  # Key or mouse button id, see EventStore.key_id
+    ("x", "i", np.int32),
+    ("y", "i", np.int32),
+)
+
+INITIAL_CAPACITY = 4096
+
+
+class EventStore:
+    """Activity events kept in parallel typed arrays instead of (timestamp, string) tuples.
+
+    With a capacity the store is a ring buffer that keeps only the most recent events, so its
+    memory use is fixed; without one it grows geometrically. Columns are exposed to NumPy
+    without copying.
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity
+        self._size = capacity or INITIAL_CAPACITY
+        self._columns = [array(typecode, bytes(array(typecode).itemsize * self._size)) for _, typecode, _ in COLUMNS]
+        self._count = 0   # Events currently held
+        self._next = 0    # Slot the next event is written to
+        self.dropped = 0  # Events overwritten in ring mode
+        self.key_names = []
+        self._key_ids = {}
+
+    def __len__(self):
+        return self._count
+
+    # Small integer id for a key or button name, assigned on first use
+    def key_id(self, name):
+        key_id = self._key_ids.get(name)
+        if key_id is None:
+            key_id = self._key_ids[name] = len(self.key_names)
+            self.key_names.append(name)
+        return key_id
+
+    def append(self, timestamp, code, key=0, x=0, y=0):
+        if self._next == self._size:
+            if self.capacity:
+                self._next = 0
+            else:
+                self._grow()
+        slot = self._next
+        timestamps, codes, keys, xs, ys = self._columns
+        timestamps[slot] = timestamp
+        codes[slot] = code
+        keys[slot] = key
+        xs[slot] = x
+        ys[slot] = y
+        self._next = slot + 1
+        if self._count < self._size:
+            self._count += 1
+        else:
+            self.dropped += 1
+
+    def _grow(self):
+        # Build new arrays rather than resizing in place, so existing NumPy views stay valid
+        extra = self._size
+        self._columns = [column + array(column.typecode, bytes(column.itemsize * extra)) for column in self._columns]
+        self._size += extra
+
+    def clear(self):
+        self._count = self._next = self.dropped = 0
+
+    # Index of the oldest event in the underlying arrays
+    def _start(self):
+        return self._next % self._size if self._count == self._size and self.capacity else 0
+
+    # Column arrays in chronological order; zero-copy unless a ring buffer has wrapped around
+    def to_numpy(self):
+        start = self._start()
+        columns = {}
+        for (name, _, dtype), column in zip(COLUMNS, self._columns):
+            view = np.frombuffer(column, dtype=dtype)[:self._size]
+            columns[name] = view[:self._count] if start == 0 else np.concatenate((view[start:], view[:start]))
+        return columns
+
+    # (timestamp, code, key, x, y) tuples in chronological order
+    def __iter__(self):
+        start = self._start()
+        for offset in range(self._count):
+            slot = (start + offset) % self._size
+            yield tuple(column[slot] for column in self._columns)
+
+    # Human-readable description of an event tuple, built only when something needs to display it
+    def describe(self, event):
+        timestamp, code, key, x, y = event
+        if code == KEY_PRESS:
+            return f"Key Press: {self.key_names[key]}"
+        if code == MOUSE_MOVE:
+            return f"Mouse Move: ({x}, {y})"
+        return EVENT_NAMES.get(code, f"Event {code}")
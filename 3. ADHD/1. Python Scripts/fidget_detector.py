@@ -0,0 +1,144 @@
+import threading
+from collections import deque
+
+from event_store import KEY_PRESS, MOUSE_MOVE, MOUSE_PRESS, MOUSE_RELEASE
+
+
+class FidgetDetector:
+    """Online fidget, burst and ADHD assessment tracking, updated in O(1) amortized per event.
+
+    Fidget interval: at least min_actions fidget events, each within max_gap seconds of the
+    previous one. Burst: the same key pressed key_burst_min times in a row, or click_burst_min
+    clicks within burst_window seconds. The assessment uses the same thresholds as the report.
+    """
+
+    def __init__(self, min_actions=2, max_gap=1.0, key_burst_min=3, click_burst_min=4, burst_window=2.0,
+                 rate_window=5.0, burst_threshold=5, fidget_time_threshold=10.0, fidget_count_threshold=10,
+                 fidget_codes=(MOUSE_PRESS, MOUSE_RELEASE, KEY_PRESS, MOUSE_MOVE)):
+        self.min_actions = min_actions
+        self.max_gap = max_gap
+        self.key_burst_min = key_burst_min
+        self.click_burst_min = click_burst_min
+        self.burst_window = burst_window
+        self.rate_window = rate_window
+        self.burst_threshold = burst_threshold
+        self.fidget_time_threshold = fidget_time_threshold
+        self.fidget_count_threshold = fidget_count_threshold
+        self.fidget_codes = frozenset(fidget_codes)
+        self._lock = threading.Lock()
+
+        self.events = 0
+        self.first_time = None
+        self.last_time = None
+        self.closed_intervals = []
+        self.closed_fidget_time = 0.0
+        self.burst_count = 0
+        # Current run of fidget events
+        self._run_start = None
+        self._run_last = None
+        self._run_count = 0
+        # Burst state
+        self._last_key = None
+        self._key_repeats = 0
+        self._recent_clicks = deque()
+        # Timestamps inside the rate window
+        self._recent_events = deque()
+
+    # Feed one event; returns True if it completed a burst
+    def update(self, timestamp, code, key=0):
+        with self._lock:
+            self.events += 1
+            if self.first_time is None:
+                self.first_time = timestamp
+            self.last_time = timestamp
+
+            recent = self._recent_events
+            recent.append(timestamp)
+            while recent[0] < timestamp - self.rate_window:
+                recent.popleft()
+
+            if code in self.fidget_codes:
+                if self._run_count and timestamp - self._run_last <= self.max_gap:
+                    self._run_count += 1
+                    self._run_last = timestamp
+                else:
+                    self._close_run()
+                    self._run_start = self._run_last = timestamp
+                    self._run_count = 1
+            else:
+                self._close_run()
+
+            return self._update_bursts(timestamp, code, key)
+
+    def update_many(self, timestamps, codes, keys):
+        for timestamp, code, key in zip(timestamps, codes, keys):
+            self.update(timestamp, code, key)
+
+    def _update_bursts(self, timestamp, code, key):
+        burst = False
+        if code == KEY_PRESS:
+            if key == self._last_key:
+                self._key_repeats += 1
+            else:
+                self._key_repeats = 1
+            self._last_key = key
+            if self._key_repeats >= self.key_burst_min:
+                burst = True
+                self._key_repeats = 0
+        elif code in (MOUSE_PRESS, MOUSE_RELEASE):
+            self._last_key = None
+            if code == MOUSE_PRESS:
+                clicks = self._recent_clicks
+                clicks.append(timestamp)
+                while clicks[0] < timestamp - self.burst_window:
+                    clicks.popleft()
+                if len(clicks) >= self.click_burst_min:
+                    burst = True
+                    clicks.clear()
+        if burst:
+            self.burst_count += 1
+        return burst
+
+    def _close_run(self):
+        if self._run_count >= self.min_actions:
+            self.closed_intervals.append((self._run_start, self._run_last))
+            self.closed_fidget_time += self._run_last - self._run_start
+        self._run_count = 0
+
+    # Close the interval in progress (call once the session has ended)
+    def finish(self):
+        with self._lock:
+            self._close_run()
+
+    # Closed intervals plus the one in progress, if it already qualifies
+    def intervals(self):
+        with self._lock:
+            return self._intervals()
+
+    def _intervals(self):
+        if self._run_count >= self.min_actions:
+            return self.closed_intervals + [(self._run_start, self._run_last)]
+        return list(self.closed_intervals)
+
+    def is_adhd_suspected(self, burst_count, total_fidget_time, fidget_count):
+        return (burst_count > self.burst_threshold or total_fidget_time > self.fidget_time_threshold
+                or fidget_count > self.fidget_count_threshold)
+
+    # Point-in-time view of the session, safe to call from another thread while events arrive
+    def snapshot(self):
+        with self._lock:
+            total_fidget_time = self.closed_fidget_time
+            fidget_count = len(self.closed_intervals)
+            if self._run_count >= self.min_actions:
+                total_fidget_time += self._run_last - self._run_start
+                fidget_count += 1
+            window = min(self.rate_window, self.last_time - self.first_time) if self.events else 0.0
+            return {
+                "events": self.events,
+                "elapsed_seconds": self.last_time - self.first_time if self.events else 0.0,
+                "fidget_count": fidget_count,
+                "total_fidget_time": total_fidget_time,
+                "burst_count": self.burst_count,
+                "events_per_second": len(self._recent_events) / window if window > 0 else 0.0,
+                "adhd_suspected": self.is_adhd_suspected(self.burst_count, total_fidget_time, fidget_count),
+            }
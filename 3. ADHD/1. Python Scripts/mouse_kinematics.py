@@ -0,0 +1,156 @@
+import math
+
+import numpy as np
+
+IDLE_GAP_SECONDS = 0.5  # A pause between pointer samples longer than this counts as idle time
+DIRECTION_CHANGE_DEGREES = 90  # Turns sharper than this count as a change of direction
+WINDOW_SECONDS = 5.0
+WINDOW_STEP_SECONDS = 1.0
+MIN_DT = 1e-3  # Lower bound on the time between samples, so coincident timestamps don't divide by zero
+
+# Per-session pointer features, as columns of the cohort table
+KINEMATIC_FIELDS = ("mean_speed", "p95_window_speed", "mean_abs_jerk", "direction_change_rate", "idle_seconds")
+
+
+class MoveSampler:
+    """Adaptive sampling of pointer moves on the listener thread.
+
+    The OS reports moves at its own rate (often several hundred per second). A move becomes a
+    sample once the pointer has travelled min_distance pixels, or reversed direction, since the
+    last sample and at least min_interval seconds have passed. Slow drifts are still sampled every
+    max_interval. Fast movement is therefore sampled densely and jitter is coalesced. A move held
+    back just before a pause is emitted once the pointer moves again, so samples keep both the
+    resting position and the length of the pause.
+    """
+
+    def __init__(self, min_interval=0.01, min_distance=3, max_interval=0.1):
+        self.min_interval = min_interval
+        self.min_distance_sq = min_distance * min_distance
+        self.max_interval = max_interval
+        self.received = 0
+        self.emitted = 0
+        self._last = None     # Last sample (timestamp, x, y)
+        self._pending = None  # Latest move not yet emitted
+        self._heading = (0, 0)
+
+    # Offer one OS move event; returns the samples to record (usually none or one)
+    def offer(self, timestamp, x, y):
+        self.received += 1
+        samples = []
+        pending = self._pending
+        if pending is not None and timestamp - pending[0] >= self.max_interval:
+            self._emit(pending, samples)  # The pointer rested here before this move
+
+        move = (timestamp, x, y)
+        last = self._last
+        if last is None:
+            self._emit(move, samples)
+            return samples
+        dx = x - last[1]
+        dy = y - last[2]
+        elapsed = timestamp - last[0]
+        reversed_direction = dx * self._heading[0] + dy * self._heading[1] < 0
+        if elapsed >= self.max_interval or (elapsed >= self.min_interval and (
+                dx * dx + dy * dy >= self.min_distance_sq or reversed_direction)):
+            self._emit(move, samples)
+        else:
+            self._pending = move
+        return samples
+
+    # The move held back at the end of capture, if any
+    def flush(self):
+        samples = []
+        if self._pending is not None:
+            self._emit(self._pending, samples)
+        return samples
+
+    def _emit(self, move, samples):
+        if self._last is not None:
+            self._heading = (move[1] - self._last[1], move[2] - self._last[2])
+        self._last = move
+        self._pending = None
+        self.emitted += 1
+        samples.append(move)
+
+
+# Per-sample kinematics of a pointer trace: segment speeds, then accelerations and jerks by
+# successive differences, turning angles between consecutive segments, and idle gaps
+def kinematics(timestamps, xs, ys):
+    t = np.asarray(timestamps, dtype=np.float64)
+    dt = np.maximum(np.diff(t), MIN_DT)
+    dx = np.diff(np.asarray(xs, dtype=np.float64))
+    dy = np.diff(np.asarray(ys, dtype=np.float64))
+    distance = np.hypot(dx, dy)
+    speed = distance / dt
+    acceleration = np.diff(speed) / ((dt[:-1] + dt[1:]) / 2)
+    jerk = np.diff(acceleration) / ((dt[1:-1] + dt[2:]) / 2) if len(dt) > 2 else np.zeros(0)
+
+    turning = np.abs(np.arctan2(dx[:-1] * dy[1:] - dy[:-1] * dx[1:], dx[:-1] * dx[1:] + dy[:-1] * dy[1:]))
+    moved = (distance[:-1] > 0) & (distance[1:] > 0)
+    direction_change = moved & (turning > math.radians(DIRECTION_CHANGE_DEGREES))
+    gaps = np.diff(t)
+    return {
+        "segment_time": t[1:],
+        "distance": distance,
+        "speed": speed,
+        "acceleration_time": t[2:],
+        "acceleration": acceleration,
+        "jerk_time": t[3:],
+        "jerk": jerk,
+        "direction_change": direction_change,
+        "idle_seconds": np.where(gaps > IDLE_GAP_SECONDS, gaps, 0.0),
+    }
+
+
+# Sum and count of values whose times fall in each [start, start + window) window, from one cumulative sum
+def _window_sums(times, values, starts, window):
+    totals = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    low = np.searchsorted(times, starts, side="left")
+    high = np.searchsorted(times, starts + window, side="left")
+    return totals[high] - totals[low], high - low
+
+
+# Pointer features over sliding windows of a session; every feature is one cumulative-sum pass
+def window_features(timestamps, xs, ys, window=WINDOW_SECONDS, step=WINDOW_STEP_SECONDS):
+    t = np.asarray(timestamps, dtype=np.float64)
+    if len(t) < 2:
+        return {"start": np.zeros(0)}
+    return _window_features(t, kinematics(t, xs, ys), window, step)
+
+
+def _window_features(t, motion, window, step):
+    window_count = max(1, int(math.ceil((t[-1] - t[0] - window) / step)) + 1)
+    starts = t[0] + step * np.arange(window_count)
+
+    segment_time = motion["segment_time"]
+    path_length, _ = _window_sums(segment_time, motion["distance"], starts, window)
+    acceleration, acceleration_count = _window_sums(motion["acceleration_time"], np.abs(motion["acceleration"]), starts, window)
+    jerk, jerk_count = _window_sums(motion["jerk_time"], np.abs(motion["jerk"]), starts, window)
+    direction_changes, _ = _window_sums(motion["acceleration_time"], motion["direction_change"], starts, window)
+    idle_seconds, _ = _window_sums(segment_time, motion["idle_seconds"], starts, window)
+    return {
+        "start": starts,
+        "path_length": path_length,
+        "mean_speed": path_length / window,
+        "mean_abs_acceleration": acceleration / np.maximum(acceleration_count, 1),
+        "mean_abs_jerk": jerk / np.maximum(jerk_count, 1),
+        "direction_change_rate": direction_changes / window,
+        "idle_seconds": np.minimum(idle_seconds, window),
+    }
+
+
+# Session-level pointer features (KINEMATIC_FIELDS) from the move samples of a session
+def kinematic_summary(timestamps, xs, ys, window=WINDOW_SECONDS, step=WINDOW_STEP_SECONDS):
+    t = np.asarray(timestamps, dtype=np.float64)
+    if len(t) < 2:
+        return dict.fromkeys(KINEMATIC_FIELDS, 0.0)
+    motion = kinematics(t, xs, ys)
+    windows = _window_features(t, motion, window, step)
+    duration = max(float(t[-1] - t[0]), MIN_DT)
+    return {
+        "mean_speed": float(motion["distance"].sum() / duration),
+        "p95_window_speed": float(np.percentile(windows["mean_speed"], 95)),
+        "mean_abs_jerk": float(np.abs(motion["jerk"]).mean()) if len(motion["jerk"]) else 0.0,
+        "direction_change_rate": float(motion["direction_change"].sum() / duration),
+        "idle_seconds": float(motion["idle_seconds"].sum()),
+    }
@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+
+from column_table import CategoryCodes, ColumnTable
+from event_store import MOUSE_MOVE
+from mouse_kinematics import KINEMATIC_FIELDS
+
+# Tables kept in a metrics directory. Interval and event rows point at their session by its row
+# number in the sessions table.
+SESSION_COLUMNS = (("session", "str"), ("start_time", "<f8"), ("events", "<i8"), ("duration_seconds", "<f8"),
+                   ("fidget_count", "<i4"), ("total_fidget_time", "<f8"), ("burst_count", "<i4"),
+                   ("adhd_suspected", "?")) + tuple((field, "<f8") for field in KINEMATIC_FIELDS)
+INTERVAL_COLUMNS = (("session_row", "<i8"), ("start", "<f8"), ("end", "<f8"))
+EVENT_COLUMNS = (("session_row", "<i8"), ("timestamp", "<f8"), ("code", "u1"), ("key", "category"), ("x", "<i4"),
+                 ("y", "<i4"))
+TABLES = {"sessions": SESSION_COLUMNS, "intervals": INTERVAL_COLUMNS, "events": EVENT_COLUMNS}
+
+
+def open_table(metrics_dir, name):
+    return ColumnTable(os.path.join(metrics_dir, name), TABLES[name])
+
+
+# Append one analyzed session: its metrics row (SESSION_COLUMNS fields), fidget intervals and,
+# if given, its event columns with the key names their key ids refer to. The session row is
+# written first, so an interrupted export never leaves events pointing at another session.
+# Returns the session's row number.
+def export_session(metrics_dir, row, intervals=(), events=None, key_names=()):
+    sessions = open_table(metrics_dir, "sessions")
+    session_row = sessions.append({name: [row[name]] for name, _ in SESSION_COLUMNS}) - 1
+
+    intervals = np.asarray(intervals, dtype=np.float64).reshape(-1, 2)
+    open_table(metrics_dir, "intervals").append({
+        "session_row": np.full(len(intervals), session_row),
+        "start": intervals[:, 0],
+        "end": intervals[:, 1],
+    })
+
+    if events is not None:
+        codes = events["code"]
+        # Mouse moves carry no key; their key column is only a placeholder
+        keys = np.where(codes == MOUSE_MOVE, -1, events["key"])
+        open_table(metrics_dir, "events").append({
+            "session_row": np.full(len(codes), session_row),
+            "timestamp": events["timestamp"],
+            "code": codes,
+            "key": CategoryCodes(keys, list(key_names)),
+            "x": events["x"],
+            "y": events["y"],
+        })
+    return session_row
+
+
+# Cohort table rows (see cohort_analysis.TABLE_FIELDS) of every exported session
+def session_rows(metrics_dir):
+    sessions = open_table(metrics_dir, "sessions")
+    columns = {name: sessions.values(name) for name, _ in SESSION_COLUMNS}
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
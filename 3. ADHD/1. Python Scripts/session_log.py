@@ -0,0 +1,208 @@
+import argparse
+import os
+import random
+import struct
+import time
+
+import numpy as np
+
+from event_store import EVENT_NAMES, KEY_PRESS, MOUSE_MOVE, MOUSE_PRESS, MOUSE_RELEASE
+
+# File layout: a 24-byte header, then fixed-size 24-byte little-endian records. Event records hold
+# (timestamp, code, key id, x, y). A key or button name is written the first time it is seen as
+# KEY_NAME records (15 UTF-8 bytes each, KEY_NAME_MORE for the rest); ids follow in order of appearance.
+MAGIC = b"ADHDSESS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHd4x")  # magic, version, record size, session start time
+EVENT_RECORD = struct.Struct("<dB3xiii")
+NAME_RECORD = struct.Struct("<8xB15s")
+RECORD_SIZE = EVENT_RECORD.size
+KEY_NAME = 0
+KEY_NAME_MORE = 255
+NO_KEY = -1  # Events without a key or button (mouse moves)
+
+RECORD_DTYPE = np.dtype({
+    "names": ["timestamp", "code", "key", "x", "y"],
+    "formats": ["<f8", "u1", "<i4", "<i4", "<i4"],
+    "offsets": [0, 8, 12, 16, 20],
+    "itemsize": RECORD_SIZE,
+})
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class SessionWriter:
+    """Append-only binary log of the raw input events of one session.
+
+    Records go through a buffered file, so a write is a struct pack and a memory copy; flush()
+    pushes them to disk (the capture loop calls it about once a second). A crash loses at most
+    the unflushed tail, and readers ignore a trailing partial record.
+    """
+
+    def __init__(self, path, start_time=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.path = path
+        self.events = 0
+        self._key_ids = {}
+        self._file = open(path, "wb", buffering=buffer_size)
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD_SIZE, time.time() if start_time is None else start_time))
+        self._file.flush()
+
+    def _key_id(self, key):
+        if key is None:
+            return NO_KEY
+        name = str(key)
+        key_id = self._key_ids.get(name)
+        if key_id is None:
+            key_id = self._key_ids[name] = len(self._key_ids)
+            encoded = name.encode("utf-8")
+            chunks = [encoded[i:i + 15] for i in range(0, len(encoded), 15)] or [b""]
+            self._file.write(NAME_RECORD.pack(KEY_NAME, chunks[0]))
+            for chunk in chunks[1:]:
+                self._file.write(NAME_RECORD.pack(KEY_NAME_MORE, chunk))
+        return key_id
+
+    # key is any object whose str() names the key or button (pynput keys, or names read back from a log)
+    def write(self, timestamp, code, key=None, x=0, y=0):
+        self._file.write(EVENT_RECORD.pack(timestamp, code, self._key_id(key), int(x), int(y)))
+        self.events += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Session:
+    """A session log opened for reading: header fields, key names, and event columns.
+
+    The columns are NumPy views of a read-only memory map, so opening a log does not read it;
+    only the filtering of name records copies the event columns.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"'{path}' is not an ADHD session log (file too short).")
+        magic, version, record_size, self.start_time = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not an ADHD session log.")
+        if version != FORMAT_VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"'{path}' uses session log format {version}, expected {FORMAT_VERSION}.")
+
+        count = (os.path.getsize(path) - HEADER.size) // RECORD_SIZE  # A partial last record is ignored
+        if count:
+            raw = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER.size, shape=(count, RECORD_SIZE))
+        else:
+            raw = np.zeros((0, RECORD_SIZE), dtype=np.uint8)
+        records = raw.reshape(-1).view(RECORD_DTYPE)
+        codes = records["code"]
+        is_name = (codes == KEY_NAME) | (codes == KEY_NAME_MORE)
+        self.key_names = self._read_key_names(raw[is_name]) if is_name.any() else []
+        events = records[~is_name] if is_name.any() else records
+        self.columns = {name: events[name] for name in RECORD_DTYPE.names}
+
+    @staticmethod
+    def _read_key_names(name_rows):
+        names = []
+        for row in name_rows:
+            chunk = row[9:].tobytes().rstrip(b"\0")
+            if row[8] == KEY_NAME:
+                names.append(chunk)
+            else:
+                names[-1] += chunk
+        return [name.decode("utf-8", errors="replace") for name in names]
+
+    def __len__(self):
+        return len(self.columns["timestamp"])
+
+    @property
+    def duration(self):
+        timestamps = self.columns["timestamp"]
+        return float(timestamps[-1] - timestamps[0]) if len(timestamps) else 0.0
+
+    # (timestamp, code, key name or None, x, y) tuples in recorded order
+    def events(self):
+        names = self.key_names
+        columns = self.columns
+        for timestamp, code, key, x, y in zip(*(columns[name].tolist() for name in RECORD_DTYPE.names)):
+            yield timestamp, code, names[key] if key >= 0 else None, x, y
+
+
+# Synthetic activity: bursts of high-rate mouse moves, key presses and click pairs, yielded as
+# (timestamp, event code, key name, x, y)
+def synthetic_events(count, rng, start_time=1_700_000_000.0):
+    timestamp = start_time
+    x, y = 500, 400
+    produced = 0
+    while produced < count:
+        kind = rng.random()
+        if kind < 0.7:
+            burst = []
+            for _ in range(rng.randint(5, 50)):
+                timestamp += rng.uniform(0.005, 0.02)  # 50-200 Hz pointer events
+                x += rng.randint(-40, 40)
+                y += rng.randint(-20, 20)
+                burst.append((timestamp, MOUSE_MOVE, None, x, y))
+        elif kind < 0.9:
+            burst = []
+            for _ in range(rng.randint(1, 8)):
+                timestamp += rng.uniform(0.05, 0.3)
+                burst.append((timestamp, KEY_PRESS, f"'{'asdfjkl'[rng.randrange(7)]}'", 0, 0))
+        else:
+            timestamp += rng.uniform(0.1, 1.0)
+            burst = [(timestamp, MOUSE_PRESS, "Button.left", x, y)]
+            timestamp += rng.uniform(0.05, 0.2)
+            burst.append((timestamp, MOUSE_RELEASE, "Button.left", x, y))
+        for event in burst[:count - produced]:
+            yield event
+        produced += len(burst)
+        timestamp += rng.expovariate(1.0)  # Idle gap between bursts
+
+
+def write_synthetic_session(path, count, seed=0):
+    rng = random.Random(seed)
+    events = synthetic_events(count, rng)
+    first = next(events, None)
+    with SessionWriter(path, start_time=first[0] if first else None) as writer:
+        if first:
+            writer.write(*first)
+        for event in events:
+            writer.write(*event)
+
+
+def describe_session(path):
+    session = Session(path)
+    codes = session.columns["code"]
+    print(f"{path}: {len(session)} events over {session.duration:.1f}s, {len(session.key_names)} distinct keys/buttons")
+    for code, name in EVENT_NAMES.items():
+        print(f"  {name}: {int(np.count_nonzero(codes == code))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or generate ADHD session logs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    info_parser = subparsers.add_parser("info", help="Summarize a session log")
+    info_parser.add_argument("path")
+    synth_parser = subparsers.add_parser("synth", help="Write a synthetic session log")
+    synth_parser.add_argument("path")
+    synth_parser.add_argument("--events", type=int, default=50000)
+    synth_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "synth":
+        write_synthetic_session(args.path, args.events, args.seed)
+    describe_session(args.path)
+
+
+if __name__ == "__main__":
+    main()
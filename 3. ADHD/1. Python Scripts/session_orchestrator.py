@@ -0,0 +1,208 @@
+import importlib
+import importlib.util
+import itertools
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ADHD_PATH = os.path.join(SCRIPT_DIR, "2. ADHD.py")
+SESSIONS_DIR = os.path.join(SCRIPT_DIR, "sessions")
+
+# Session lifecycle states
+QUEUED = "queued"
+STARTING = "starting"
+RUNNING = "running"
+FINISHED = "finished"
+CANCELLED = "cancelled"
+FAILED = "failed"
+DONE_STATES = (FINISHED, CANCELLED, FAILED)
+
+
+def load_adhd():
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    spec = importlib.util.spec_from_file_location("ADHD", ADHD_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class SessionJob:
+    """One queued capture session, with its lifecycle state, progress and result."""
+
+    def __init__(self, job_id, subject, duration, output_dir, on_start):
+        self.id = job_id
+        self.subject = subject
+        self.duration = duration
+        self.output_dir = output_dir
+        self.on_start = on_start
+        self.state = QUEUED
+        self.progress = 0.0
+        self.snapshot = {}
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    # Cancel a queued session, or end a running one early (no report is written)
+    def cancel(self):
+        self._cancel.set()
+
+    # Block until the session has finished, been cancelled or failed; returns True if it has
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def describe(self):
+        label = f"Session {self.id}" + (f" ({self.subject})" if self.subject else "")
+        if self.state == RUNNING:
+            return f"{label}: {self.state} {self.progress:.0%}, {self.snapshot.get('events', 0)} events"
+        if self.state == FAILED:
+            return f"{label}: {self.state} ({self.error})"
+        return f"{label}: {self.state}"
+
+
+class SessionOrchestrator:
+    """Runs ADHD capture sessions one after another on a background thread of this process.
+
+    The worker imports the ADHD script, pynput and the report modules (matplotlib, reportlab)
+    once, in the background as soon as the orchestrator is created. Queued sessions then start without paying
+    interpreter or import startup again. A session's PDF is rendered on the report service while the
+    next one captures; the session finishes once its report is written. Every lifecycle change and
+    progress tick is passed to on_event(job), on the worker or report thread.
+    """
+
+    def __init__(self, on_event=None, sessions_dir=SESSIONS_DIR, setup_seconds=2):
+        self.on_event = on_event
+        self.sessions_dir = sessions_dir
+        self.setup_seconds = setup_seconds
+        self.adhd = None
+        self.warm_error = None
+        self._jobs = []
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._warm = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="adhd-sessions", daemon=True)
+        self._thread.start()
+
+    # Queue a session; output goes to its own folder under sessions_dir unless output_dir is given.
+    # on_start(job) runs on the worker thread just before capture starts (e.g. to open the video).
+    def submit(self, subject=None, duration=None, output_dir=None, on_start=None):
+        with self._lock:
+            job_id = next(self._ids)
+            if output_dir is None:
+                folder = time.strftime("%Y%m%d-%H%M%S") + f"-{job_id}" + (f"-{subject}" if subject else "")
+                output_dir = os.path.join(self.sessions_dir, folder)
+            job = SessionJob(job_id, subject, duration, output_dir, on_start)
+            self._jobs.append(job)
+        self._queue.put(job)
+        self._notify(job)
+        return job
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs)
+
+    def cancel_all(self):
+        for job in self.jobs():
+            job.cancel()
+
+    # Block until the modules are imported; returns False if warming up failed
+    def wait_until_warm(self, timeout=None):
+        self._warm.wait(timeout)
+        return self.adhd is not None
+
+    # Stop the worker after the queued sessions (or cancel them all first with cancel=True)
+    def shutdown(self, cancel=False, timeout=None):
+        if cancel:
+            self.cancel_all()
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            self.adhd = load_adhd()
+            # Pre-loads pynput (its package imports the keyboard and mouse listeners) and the report
+            # modules, so the first session starts, and writes its report, without import delays
+            importlib.import_module("pynput")
+            self.adhd.preload_report_modules()
+        except Exception as e:
+            self.warm_error = f"{type(e).__name__}: {e}"
+        self._warm.set()
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self._run_job(job)
+
+    def _run_job(self, job):
+        if job._cancel.is_set():
+            self._finish(job, CANCELLED)
+            return
+        if self.warm_error is not None:
+            job.error = self.warm_error
+            self._finish(job, FAILED)
+            return
+
+        job.started_at = time.time()
+        job.state = STARTING
+        self._notify(job)
+        try:
+            if job.on_start is not None:
+                job.on_start(job)
+            duration = job.duration or self.adhd.PROGRAM_DURATION_SECONDS
+            job.result = self.adhd.run_session(duration, job.output_dir, cancel_event=job._cancel,
+                                               on_progress=lambda snapshot: self._progress(job, snapshot),
+                                               setup_seconds=self.setup_seconds, wait_for_report=False)
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+            self._finish(job, FAILED)
+            return
+        pending_report = job.result.pop("pending_report", None)
+        if pending_report is None:
+            self._finish(job, CANCELLED if job.result.get("cancelled") else FINISHED)
+        else:
+            # The next session starts while this one's PDF is rendered in the background
+            pending_report.add_done_callback(lambda future: self._report_written(job, future))
+
+    def _report_written(self, job, future):
+        error = future.exception()
+        if error is not None:
+            job.error = f"{type(error).__name__}: {error}"
+            self._finish(job, FAILED)
+        else:
+            self._finish(job, FINISHED)
+
+    def _progress(self, job, snapshot):
+        job.state = RUNNING
+        job.snapshot = snapshot
+        job.progress = min(1.0, snapshot["elapsed"] / snapshot["duration"]) if snapshot["duration"] else 1.0
+        self._notify(job)
+
+    def _finish(self, job, state):
+        job.state = state
+        if state == FINISHED:
+            job.progress = 1.0
+        job.finished_at = time.time()
+        self._notify(job)
+        job._done.set()
+
+    def _notify(self, job):
+        if self.on_event is not None:
+            try:
+                self.on_event(job)
+            except Exception:
+                traceback.print_exc()
@@ -0,0 +1,65 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from event_store import EVENT_NAMES
+
+# Upper bound on time buckets, so render time does not depend on the number of events
+MAX_BUCKETS = 300
+EVENT_COLORS = {1: "tab:red", 2: "tab:orange", 3: "tab:blue", 4: "tab:green"}
+
+
+# Count events per (event type, time bucket) in one vectorized pass
+def bin_events(timestamps, codes, bucket_seconds=None, max_buckets=MAX_BUCKETS):
+    event_codes = sorted(EVENT_NAMES)
+    if len(timestamps) == 0:
+        return event_codes, np.zeros((len(event_codes), 1)), 1.0, 0.0
+
+    start = float(timestamps[0])
+    duration = max(float(timestamps[-1]) - start, 1e-9)
+    if bucket_seconds is None:
+        bucket_seconds = max(duration / max_buckets, 1.0)
+    bucket_count = min(int(duration // bucket_seconds) + 1, max_buckets)
+
+    buckets = np.minimum(((timestamps - start) / bucket_seconds).astype(np.int64), bucket_count - 1)
+    rows = np.searchsorted(event_codes, codes)
+    valid = (rows < len(event_codes)) & (np.asarray(event_codes)[np.minimum(rows, len(event_codes) - 1)] == codes)
+    counts = np.bincount(rows[valid] * bucket_count + buckets[valid], minlength=len(event_codes) * bucket_count)
+    return event_codes, counts.reshape(len(event_codes), bucket_count), bucket_seconds, start
+
+
+# Draw the activity timeline: stacked per-type event rate above a per-type rate heatmap, with
+# fidgeting intervals shaded. Uses the Agg canvas directly, so no display or pyplot state is needed.
+# output is a filename or a binary file-like object (e.g. io.BytesIO).
+def render_activity_timeline(columns, output, intervals=(), bucket_seconds=None, max_buckets=MAX_BUCKETS, dpi=100):
+    timestamps = np.asarray(columns["timestamp"], dtype=np.float64)
+    codes = np.asarray(columns["code"])
+    event_codes, counts, bucket_seconds, start = bin_events(timestamps, codes, bucket_seconds, max_buckets)
+    rates = counts / bucket_seconds
+    edges = np.arange(counts.shape[1]) * bucket_seconds
+
+    figure = Figure(figsize=(10, 6), dpi=dpi)
+    FigureCanvasAgg(figure)
+    rate_axes, heat_axes = figure.subplots(2, 1, sharex=True, gridspec_kw={"height_ratios": [3, 1]})
+
+    labels = [EVENT_NAMES[code] for code in event_codes]
+    colors = [EVENT_COLORS.get(code, "gray") for code in event_codes]
+    rate_axes.stackplot(edges, rates, labels=labels, colors=colors, step="post")
+    if len(intervals):
+        spans = [(interval_start - start, interval_end - interval_start) for interval_start, interval_end in intervals]
+        top = max(float(rates.sum(axis=0).max()), 1.0)
+        rate_axes.broken_barh(spans, (0, top), facecolors="gray", alpha=0.2, label="Fidgeting", zorder=0)
+    rate_axes.set_ylabel("Events per second")
+    rate_axes.set_title("User Activity Over Time")
+    rate_axes.legend(loc="upper right", fontsize=8)
+
+    # Scale each row to its own peak so rare event types stay visible next to mouse moves
+    peaks = rates.max(axis=1, keepdims=True)
+    heat_axes.imshow(np.divide(rates, peaks, out=np.zeros_like(rates), where=peaks > 0), aspect="auto", interpolation="nearest", cmap="viridis",
+                     extent=(0, counts.shape[1] * bucket_seconds, len(event_codes) - 0.5, -0.5))
+    heat_axes.set_yticks(range(len(event_codes)))
+    heat_axes.set_yticklabels(labels, fontsize=8)
+    heat_axes.set_xlabel(f"Seconds since start ({bucket_seconds:.3g}s buckets)")
+
+    figure.tight_layout()
+    figure.savefig(output, format="png")
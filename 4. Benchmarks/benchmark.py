@@ -0,0 +1,256 @@
+import argparse
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Locations of the scripts under test
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DYSLEXIA_DIR = os.path.join(ROOT, "2. Dyslexia", "1. Python Script")
+ADHD_DIR = os.path.join(ROOT, "3. ADHD", "1. Python Scripts")
+ADHD_PATH = os.path.join(ADHD_DIR, "2. ADHD.py")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# A result is flagged when throughput drops, or p95 latency grows, by more than this fraction
+REGRESSION_TOLERANCE = 0.20
+
+
+def load_dyslexia():
+    if DYSLEXIA_DIR not in sys.path:
+        sys.path.insert(0, DYSLEXIA_DIR)
+    import Dyslexia
+    return Dyslexia
+
+
+def load_adhd():
+    os.environ.setdefault("MPLBACKEND", "Agg")  # Render plots without a display
+    if ADHD_DIR not in sys.path:
+        sys.path.insert(0, ADHD_DIR)
+    spec = importlib.util.spec_from_file_location("ADHD", ADHD_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Synthetic responses: sentences from the bank with injected letter confusions, word confusions
+# and adjacent-letter transpositions; returns (response, target sentence) pairs
+def make_responses(dyslexia, count, rng, error_rate=0.3):
+    sentences = dyslexia.read_sentences_from_file(dyslexia.SENTENCES_PATH)
+    letter_swaps = {}
+    for first, second in dyslexia.DYSLEXIC_LETTER_CONFUSIONS:
+        letter_swaps.setdefault(first, []).append(second)
+        letter_swaps.setdefault(second, []).append(first)
+    word_swaps = {}
+    for confusion in dyslexia.DYSLEXIC_WORD_CONFUSIONS:
+        for word in confusion:
+            word_swaps.setdefault(word, set()).update(other for other in confusion if other != word)
+
+    pairs = []
+    for _ in range(count):
+        sentence = rng.choice(sentences)
+        words = sentence.split()
+        for i, word in enumerate(words):
+            if rng.random() >= error_rate:
+                continue
+            kind = rng.random()
+            if kind < 0.3 and word.lower() in word_swaps:
+                words[i] = rng.choice(sorted(word_swaps[word.lower()]))
+            elif kind < 0.7:
+                letters = [rng.choice(letter_swaps[c]) if c in letter_swaps and rng.random() < 0.5 else c for c in word]
+                words[i] = "".join(letters)
+            elif len(word) > 2:
+                j = rng.randrange(len(word) - 1)
+                words[i] = word[:j] + word[j + 1] + word[j] + word[j + 2:]
+        pairs.append((" ".join(words), sentence))
+    return pairs
+
+
+# Synthetic activity from session_log.synthetic_events, as (timestamp, event code, key name, x, y)
+def make_activity_events(count, rng):
+    import session_log
+    return list(session_log.synthetic_events(count, rng))
+
+
+def make_event_store(adhd, events):
+    store = adhd.EventStore()
+    for timestamp, code, key, x, y in events:
+        store.append(timestamp, code, store.key_id(key) if key is not None else 0, x, y)
+    return store
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# Run func once per item, timing each call; then rerun under tracemalloc for the peak allocation
+def measure(func, items, unit, units_per_item=1):
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        call_start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for item in items:
+        func(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "items": len(items),
+        "unit": unit,
+        "throughput": round(len(items) * units_per_item / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def bench_dyslexia(args, rng):
+    dyslexia = load_dyslexia()
+    pairs = make_responses(dyslexia, args.responses, rng)
+    dyslexia.token_score_cache.clear()
+    yield "dyslexia_analysis", measure(lambda pair: dyslexia.dyslexia_analysis(*pair), pairs, "responses/s")
+    yield "legacy_dyslexia_analysis", measure(
+        lambda pair: dyslexia.legacy_dyslexia_analysis(*pair, show_progress=False), pairs, "responses/s")
+
+    # Reports of ten responses each, rendered into memory
+    reports = [dyslexia.build_report([response for response, _ in pairs[i:i + 10]], [3.0] * 10, 3.0,
+                                     "No significant signs of dyslexia detected.", "Student", str(i))
+               for i in range(0, min(len(pairs), 200), 10)]
+    import report_renderer
+    yield "pdf_report", measure(lambda report: report_renderer.render_report(report, io.BytesIO()), reports, "reports/s")
+
+
+def bench_adhd(args, rng):
+    adhd = load_adhd()
+    events = make_activity_events(args.events, rng)
+    store = make_event_store(adhd, events)
+
+    def detect(_):
+        adhd.activity = store
+        adhd.fidget_intervals = []
+        adhd.fidget_count = 0
+        adhd.detect_fidget_intervals()
+
+    yield "detect_fidget_intervals", measure(detect, range(args.repeat), "events/s", units_per_item=len(events))
+
+    import mouse_kinematics
+    moves = [(timestamp, x, y) for timestamp, code, _, x, y in events if code == adhd.MOUSE_MOVE]
+    move_columns = [list(column) for column in zip(*moves)]
+
+    def sample_moves(_):
+        sampler = adhd.new_move_sampler()
+        for move in moves:
+            sampler.offer(*move)
+
+    yield "move_sampler", measure(sample_moves, range(args.repeat), "moves/s", units_per_item=len(moves))
+    yield "pointer_kinematics", measure(lambda _: mouse_kinematics.kinematic_summary(*move_columns), range(args.repeat),
+                                        "moves/s", units_per_item=len(moves))
+
+    plot_events = make_event_store(adhd, events[:args.plot_events])
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        def plot(_):
+            adhd.activity = plot_events
+            adhd.save_activity_plot(os.path.join(tmp_dir, "user_activity.png"))
+
+        yield "activity_plot", measure(plot, range(max(1, args.repeat // 10)), "events/s", units_per_item=len(plot_events))
+
+        log_path = os.path.join(tmp_dir, "session.adhdlog")
+        with adhd.SessionWriter(log_path) as writer:
+            for event in events:
+                writer.write(*event)
+        yield "session_replay", measure(lambda _: adhd.replay_session(log_path, report=False),
+                                        range(max(1, args.repeat // 10)), "events/s", units_per_item=len(events))
+
+        import cohort_analysis
+        yield "cohort_session_metrics", measure(lambda _: cohort_analysis.analyze_session(log_path), range(args.repeat),
+                                                "events/s", units_per_item=len(events))
+
+
+BENCHMARKS = {"dyslexia": bench_dyslexia, "adhd": bench_adhd}
+
+
+# Compare results against stored baselines of the same size; returns the names that regressed
+def compare(results, baselines):
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if not baseline or baseline["items"] != result["items"]:
+            result["vs_baseline"] = "no baseline"
+            continue
+        throughput_change = result["throughput"] / baseline["throughput"] - 1 if baseline["throughput"] else 0.0
+        p95_change = result["p95_ms"] / baseline["p95_ms"] - 1 if baseline["p95_ms"] else 0.0
+        result["vs_baseline"] = f"throughput {throughput_change:+.1%}, p95 {p95_change:+.1%}"
+        if throughput_change < -REGRESSION_TOLERANCE or p95_change > REGRESSION_TOLERANCE:
+            regressions.append(name)
+    return regressions
+
+
+def print_results(results, regressions):
+    print(f"{'benchmark':<26} {'items':>7} {'throughput':>22} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KB':>10}  vs baseline")
+    for name, result in results.items():
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<26} {result['items']:>7} {result['throughput']:>10} {result['unit']:<11} {result['p50_ms']:>9} "
+              f"{result['p95_ms']:>9} {result['p99_ms']:>9} {result['peak_memory_kb']:>10}  {result['vs_baseline']}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Dyslexia and ADHD analysis hot paths.")
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), action="append", help="Run only these suites")
+    parser.add_argument("--responses", type=int, default=2000, help="Synthetic responses for the dyslexia suite")
+    parser.add_argument("--events", type=int, default=50000, help="Synthetic activity events for the ADHD suite")
+    parser.add_argument("--plot-events", type=int, default=2000, help="Events drawn by the activity plot benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions of the ADHD benchmarks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any benchmark regressed")
+    args = parser.parse_args()
+
+    results = {}
+    for suite in args.only or sorted(BENCHMARKS):
+        rng = random.Random(args.seed)
+        try:
+            for name, result in BENCHMARKS[suite](args, rng):
+                results[name] = result
+        except ImportError as e:
+            print(f"Skipping the {suite} benchmarks: {e}")
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baselines = json.load(file).get("results", {})
+    regressions = compare(results, baselines)
+    print_results(results, regressions)
+
+    if args.save_baseline:
+        baselines.update({name: {k: v for k, v in result.items() if k != "vs_baseline"} for name, result in results.items()})
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": baselines,
+            }, file, indent=2)
+        print(f"Baseline saved to '{args.baseline}'.")
+
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Locations of the scripts under test
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DYSLEXIA_DIR = os.path.join(ROOT, "2. Dyslexia", "1. Python Script")
+ADHD_DIR = os.path.join(ROOT, "3. ADHD", "1. Python Scripts")
+
+# Scripts with spaces in their names are loaded the way the benchmark and orchestrator load them
+LOAD_SCRIPT = ("import importlib.util, sys; sys.path.insert(0, '.'); "
+               "spec = importlib.util.spec_from_file_location('target', {path!r}); "
+               "spec.loader.exec_module(importlib.util.module_from_spec(spec))")
+
+# target: (working directory, code that imports it, import-time budget in milliseconds)
+TARGETS = {
+    "dyslexia": (DYSLEXIA_DIR, "import Dyslexia", 150),
+    "adhd": (ADHD_DIR, LOAD_SCRIPT.format(path="2. ADHD.py"), 250),
+    "hub": (ADHD_DIR, LOAD_SCRIPT.format(path="1. Hub.py"), 100),
+}
+
+# Only needed once text is scored or a report is written; importing any of them at startup is a failure
+DEFERRED_MODULES = ("nltk", "tqdm", "fuzzywuzzy.fuzz", "reportlab.pdfgen.canvas", "matplotlib", "pynput")
+
+
+# Parse `-X importtime` output into (depth, module, self us, cumulative us) entries
+def parse_importtime(stderr):
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+# One run of `python -X importtime -c code`: (import entries, wall-clock seconds)
+def run_once(directory, code):
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=directory,
+                             capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "failed")
+    return parse_importtime(process.stderr), elapsed
+
+
+def total_us(entries):
+    return sum(cumulative for depth, _, _, cumulative in entries if depth == 0)
+
+
+# Fastest of repeat runs of a target, relative to an interpreter that imports nothing
+def measure_target(directory, code, repeat, baseline):
+    best = None
+    for _ in range(repeat):
+        entries, elapsed = run_once(directory, code)
+        if best is None or total_us(entries) < total_us(best[0]):
+            best = (entries, elapsed)
+    entries, elapsed = best
+    baseline_entries, baseline_elapsed = baseline
+    baseline_names = {name for _, name, _, _ in baseline_entries}
+    imported = {name for _, name, _, _ in entries}
+    return {
+        "import_ms": max(0.0, (total_us(entries) - total_us(baseline_entries)) / 1000),
+        "wall_ms": max(0.0, (elapsed - baseline_elapsed) * 1000),
+        "deferred_imported": [name for name in DEFERRED_MODULES if name in imported],
+        "slowest": sorted(((cumulative / 1000, name) for depth, name, _, cumulative in entries
+                           if depth <= 1 and name not in baseline_names), reverse=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how long each script takes to import, against a budget.")
+    parser.add_argument("--only", choices=sorted(TARGETS), action="append", help="Measure only these scripts")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per script; the fastest is reported")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports to list per script")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if a budget is exceeded "
+                                                             "or a deferred module is imported at startup")
+    args = parser.parse_args()
+
+    baseline = min((run_once(ROOT, "pass") for _ in range(args.repeat)), key=lambda run: total_us(run[0]))
+    failures = []
+    print(f"{'script':<10} {'import ms':>10} {'wall ms':>9} {'budget ms':>10}  status")
+    for name in args.only or sorted(TARGETS):
+        directory, code, budget = TARGETS[name]
+        try:
+            result = measure_target(directory, code, args.repeat, baseline)
+        except RuntimeError as e:
+            print(f"{name:<10} {'-':>10} {'-':>9} {budget:>10}  ERROR: {e}")
+            failures.append(name)
+            continue
+        problems = []
+        if result["import_ms"] > budget:
+            problems.append("over budget")
+        if result["deferred_imported"]:
+            problems.append(f"imports {', '.join(result['deferred_imported'])} at startup")
+        if problems:
+            failures.append(name)
+        print(f"{name:<10} {result['import_ms']:>10.1f} {result['wall_ms']:>9.1f} {budget:>10}  "
+              f"{'; '.join(problems) or 'ok'}")
+        for cumulative_ms, module in result["slowest"][:args.top]:
+            print(f"{'':<12}{cumulative_ms:>8.1f} ms  {module}")
+
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
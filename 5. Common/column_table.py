@@ -0,0 +1,281 @@
+import argparse
+import json
+import os
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+
+# Table layout: a directory with schema.json (column names and types, committed row count and
+# category values) and one file per column. Numeric columns hold raw little-endian values,
+# category columns int32 codes (-1 for none), and text columns the int64 end offset of each value
+# in a separate UTF-8 file.
+FORMAT_VERSION = 1
+SCHEMA_FILE = "schema.json"
+TEXT = "str"
+CATEGORY = "category"
+NO_CATEGORY = -1
+CODE_DTYPE = np.dtype("<i4")
+OFFSET_DTYPE = np.dtype("<i8")
+
+# Category values given as per-row indexes into names (-1 for none), e.g. the key ids of an
+# EventStore with its key_names; appended without building a Python string per row
+CategoryCodes = namedtuple("CategoryCodes", "codes names")
+
+
+class ColumnTable:
+    """Append-only table stored as one file per column.
+
+    Column types are a NumPy dtype string (e.g. "<f8"), "str" for text of any length, or
+    "category" for text from a small set of values (student ids, key names) stored as codes.
+    Rows are appended in batches and only become visible once schema.json records the new row
+    count, so a crash during an append leaves the earlier rows intact. Opening a table reads
+    schema.json alone; columns are NumPy views of memory-mapped files. One process appends at a time.
+    """
+
+    def __init__(self, path, schema=None):
+        self.path = path
+        schema = tuple((name, kind) for name, kind in schema) if schema is not None else None
+        if os.path.exists(os.path.join(path, SCHEMA_FILE)):
+            self.refresh()
+            if schema is not None and schema != self.schema:
+                raise ValueError(f"'{path}' has columns {list(self.schema)}, expected {list(schema)}.")
+        elif schema is None:
+            raise FileNotFoundError(f"No column table at '{path}'.")
+        else:
+            for name, kind in schema:
+                if kind not in (TEXT, CATEGORY):
+                    np.dtype(kind)  # Raises TypeError for an unknown type
+            os.makedirs(path, exist_ok=True)
+            self.schema = schema
+            self.rows = 0
+            self.categories = {name: [] for name, kind in schema if kind == CATEGORY}
+            self._commit()
+        self.types = dict(self.schema)
+
+    def __len__(self):
+        return self.rows
+
+    # Re-read the committed state, e.g. to see rows appended by another process
+    def refresh(self):
+        with open(os.path.join(self.path, SCHEMA_FILE), "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"'{self.path}' uses column table format {meta.get('format')}, expected {FORMAT_VERSION}.")
+        self.schema = tuple((name, kind) for name, kind in meta["columns"])
+        self.types = dict(self.schema)
+        self.rows = meta["rows"]
+        self.categories = meta["categories"]
+
+    def _commit(self):
+        meta = {"format": FORMAT_VERSION, "columns": [list(column) for column in self.schema], "rows": self.rows,
+                "categories": self.categories}
+        # A temporary file of its own, so a concurrent commit can never replace it half-written
+        descriptor, temp_path = tempfile.mkstemp(prefix=SCHEMA_FILE + ".", suffix=".tmp", dir=self.path)
+        try:
+            os.chmod(temp_path, 0o644)  # mkstemp creates it readable by its owner only
+            with open(descriptor, "w", encoding="utf-8") as file:
+                json.dump(meta, file)
+            os.replace(temp_path, os.path.join(self.path, SCHEMA_FILE))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _file(self, name, suffix=".bin"):
+        return os.path.join(self.path, name + suffix)
+
+    # Cut off anything an interrupted append wrote past the committed rows
+    def _truncate(self):
+        for name, kind in self.schema:
+            itemsize = OFFSET_DTYPE.itemsize if kind == TEXT else CODE_DTYPE.itemsize if kind == CATEGORY else np.dtype(kind).itemsize
+            _truncate_file(self._file(name), self.rows * itemsize)
+            if kind == TEXT:
+                _truncate_file(self._file(name, ".utf8"), int(self._text_ends(name)[-1]) if self.rows else 0)
+
+    # Append a batch of rows given as {column: values}; category values may be a CategoryCodes.
+    # Returns the new row count.
+    def append(self, columns):
+        self.refresh()
+        missing = [name for name, _ in self.schema if name not in columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        count = None
+        encoded = {}
+        for name, kind in self.schema:
+            if kind == TEXT:
+                values = [value.encode("utf-8") for value in columns[name]]
+            elif kind == CATEGORY:
+                values = self._encode(name, columns[name])
+            else:
+                values = np.asarray(columns[name], dtype=kind)
+            if count is not None and len(values) != count:
+                raise ValueError(f"Column '{name}' has {len(values)} values, expected {count}.")
+            count = len(values)
+            encoded[name] = values
+
+        self._truncate()
+        for name, kind in self.schema:
+            values = encoded[name]
+            if kind == TEXT:
+                start = int(self._text_ends(name)[-1]) if self.rows else 0
+                ends = start + np.cumsum([len(value) for value in values], dtype=np.int64)
+                with open(self._file(name, ".utf8"), "ab") as file:
+                    file.write(b"".join(values))
+                values = ends.astype(OFFSET_DTYPE)
+            with open(self._file(name), "ab") as file:
+                file.write(values.tobytes())
+        self.rows += count
+        self._commit()
+        return self.rows
+
+    def _encode(self, name, values):
+        categories = self.categories[name]
+        codes = {value: code for code, value in enumerate(categories)}
+
+        def code_of(value):
+            if value is None:
+                return NO_CATEGORY
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(categories)
+                categories.append(value)
+            return code
+
+        if isinstance(values, CategoryCodes):
+            remap = np.array([code_of(str(value)) for value in values.names] + [NO_CATEGORY], dtype=CODE_DTYPE)
+            local_codes = np.asarray(values.codes, dtype=np.int64)
+            return remap[np.where(local_codes < 0, len(values.names), local_codes)]
+        return np.array([code_of(value) for value in values], dtype=CODE_DTYPE)
+
+    def _map(self, name, dtype, suffix=".bin", count=None):
+        count = self.rows if count is None else count
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._file(name, suffix), dtype=dtype, mode="r", shape=(count,))
+
+    def _text_ends(self, name):
+        return self._map(name, OFFSET_DTYPE)
+
+    # Zero-copy view of a numeric column, or of the codes of a category column
+    def column(self, name):
+        kind = self.types[name]
+        if kind == TEXT:
+            raise TypeError(f"'{name}' is a text column; use values() or text_buffers().")
+        return self._map(name, CODE_DTYPE if kind == CATEGORY else np.dtype(kind))
+
+    # Numeric and category columns, as column() returns them
+    def columns(self):
+        return {name: self.column(name) for name, kind in self.schema if kind != TEXT}
+
+    # (end offsets, UTF-8 bytes) of a text column, both memory-mapped
+    def text_buffers(self, name):
+        ends = self._text_ends(name)
+        return ends, self._map(name, np.uint8, ".utf8", int(ends[-1]) if len(ends) else 0)
+
+    # Column values as a Python list: decoded text, category names (None where missing) or numbers
+    def values(self, name, rows=None):
+        kind = self.types[name]
+        if kind == CATEGORY:
+            categories = self.categories[name]
+            codes = self.column(name) if rows is None else self.column(name)[rows]
+            return [categories[code] if code >= 0 else None for code in codes.tolist()]
+        if kind != TEXT:
+            return (self.column(name) if rows is None else self.column(name)[rows]).tolist()
+        ends, data = self.text_buffers(name)
+        starts = np.concatenate(([0], ends[:-1]))
+        indexes = range(self.rows) if rows is None else np.arange(self.rows)[rows].tolist()
+        data = data.tobytes() if len(data) else b""
+        return [data[starts[i]:ends[i]].decode("utf-8") for i in indexes]
+
+    # Rows where a category column has the given value
+    def rows_where(self, name, value):
+        categories = self.categories[name]
+        if value not in categories:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(self.column(name) == categories.index(value))
+
+
+def _truncate_file(path, size):
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        os.truncate(path, size)
+
+
+# Snapshot of a table as one compressed .npz: text columns become NumPy unicode arrays, category
+# columns their codes plus a "<name>.categories" array
+def export_npz(table, path):
+    arrays = {}
+    for name, kind in table.schema:
+        if kind == TEXT:
+            arrays[name] = np.array(table.values(name), dtype=str)
+        else:
+            arrays[name] = np.asarray(table.column(name))
+            if kind == CATEGORY:
+                arrays[name + ".categories"] = np.array(table.categories[name], dtype=str)
+    np.savez_compressed(path, **arrays)
+
+
+# The table as a pyarrow.Table. Numeric columns and text buffers are handed over without copying;
+# category columns become dictionary arrays.
+def to_arrow(table):
+    import pyarrow as pa
+
+    arrays = {}
+    for name, kind in table.schema:
+        if kind == TEXT:
+            ends, data = table.text_buffers(name)
+            offsets = np.concatenate(([0], ends)).astype(OFFSET_DTYPE)
+            arrays[name] = pa.LargeStringArray.from_buffers(len(table), pa.py_buffer(offsets), pa.py_buffer(np.ascontiguousarray(data)))
+        elif kind == CATEGORY:
+            codes = np.asarray(table.column(name))
+            arrays[name] = pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0),
+                                                          pa.array(table.categories[name], type=pa.string()))
+        else:
+            arrays[name] = pa.array(np.asarray(table.column(name)))
+    return pa.table(arrays)
+
+
+# Write a copy of the table as .npz, .parquet or Arrow IPC (.arrow / .feather); the last two need pyarrow
+def export_table(table, path):
+    if path.endswith(".npz"):
+        export_npz(table, path)
+    elif path.endswith(".parquet"):
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(to_arrow(table), path)
+    elif path.endswith((".arrow", ".feather")):
+        import pyarrow.feather
+        pyarrow.feather.write_feather(to_arrow(table), path)
+    else:
+        raise ValueError(f"Unknown export format for '{path}' (use .npz, .parquet, .arrow or .feather).")
+
+
+def describe_table(path):
+    table = ColumnTable(path)
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    lines = [f"{path}: {len(table)} rows, {size / 1024:.1f} KB"]
+    for name, kind in table.schema:
+        detail = f" ({len(table.categories[name])} values)" if kind == CATEGORY else ""
+        lines.append(f"  {name:<24} {kind}{detail}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or export a column table.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    info = subparsers.add_parser("info", help="Print the columns and row count of tables")
+    info.add_argument("tables", nargs="+")
+    export = subparsers.add_parser("export", help="Copy a table to .npz, .parquet or .arrow")
+    export.add_argument("table")
+    export.add_argument("output")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        for path in args.tables:
+            print(describe_table(path))
+    else:
+        table = ColumnTable(args.table)
+        export_table(table, args.output)
+        print(f"Exported {len(table)} rows to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+
+
+class _LazyModule(types.ModuleType):
+    """Stands in for a module until one of its attributes is first read.
+
+    The first read imports the real module with importlib.import_module under a lock, so threads
+    touching it at the same time all wait for the complete module (importlib.util.LazyLoader can
+    hand a second thread a half-initialized one on Python 3.11). Later reads are forwarded to it.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._lazy_lock = threading.Lock()
+        self._lazy_module = None
+
+    def _lazy_load(self):
+        with self._lazy_lock:
+            if self._lazy_module is None:
+                self._lazy_module = importlib.import_module(self.__name__)
+        return self._lazy_module
+
+    def __getattr__(self, attr):
+        return getattr(self._lazy_module or self._lazy_load(), attr)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+
+# Return a module whose body runs on first attribute access instead of now. Startup only pays for
+# locating the module (which imports its parent packages); a missing module still fails here.
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    return _LazyModule(name)
+
+
+# Load lazily imported modules now, e.g. on a background thread before they are first needed
+def preload(*modules):
+    for module in modules:
+        if isinstance(module, _LazyModule):
+            module._lazy_load()
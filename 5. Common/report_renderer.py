@@ -0,0 +1,267 @@
+import io
+import os
+import threading
+import time
+
+from lazy_import import lazy_import, preload
+
+# reportlab and the worker pools are only imported once the first report is rendered
+futures = lazy_import("concurrent.futures")
+canvas = lazy_import("reportlab.pdfgen.canvas")
+pagesizes = lazy_import("reportlab.lib.pagesizes")
+rl_utils = lazy_import("reportlab.lib.utils")
+
+
+class Report:
+    """In-memory model of a report: a title and blocks laid out top to bottom.
+
+    Blocks are plain tuples and images are encoded bytes (e.g. a PNG rendered into io.BytesIO),
+    so a report pickles unchanged to a process worker. Layout, wrapping and page breaks are left
+    to render_report().
+    """
+
+    def __init__(self, title):
+        self.title = title
+        self.blocks = []
+
+    # Section heading; kept on the same page as the line that follows it
+    def heading(self, text):
+        self.blocks.append(("heading", text))
+
+    # "Label: value" line; color applies to the value
+    def field(self, label, value, color=None, size=None):
+        self.blocks.append(("field", label, str(value), color, size))
+
+    # Bulleted list entry, wrapped to the page width
+    def item(self, text):
+        self.blocks.append(("item", text))
+
+    # Paragraph, wrapped to the page width
+    def text(self, text, color=None, size=None, bold=False):
+        self.blocks.append(("text", text, color, size, bold))
+
+    # Encoded image (PNG, JPEG) drawn at width x height points, scaled down if wider than the page
+    def image(self, data, width, height):
+        self.blocks.append(("image", bytes(data), width, height))
+
+    def space(self, height):
+        self.blocks.append(("space", height))
+
+
+class PageTemplate:
+    """Page geometry and fonts shared by every report rendered with it.
+
+    Built once per process; the running header and footer rule are drawn into a PDF form once per
+    report and stamped onto each page.
+    """
+
+    def __init__(self, pagesize=None, left=100, right=72, top=40, bottom=60, indent=20, font="Helvetica",
+                 bold_font="Helvetica-Bold", title_size=16, heading_size=14, body_size=12, section_gap=10):
+        self.pagesize = pagesize
+        self.left = left
+        self.right = right
+        self.top = top
+        self.bottom = bottom
+        self.indent = indent
+        self.font = font
+        self.bold_font = bold_font
+        self.title_size = title_size
+        self.heading_size = heading_size
+        self.body_size = body_size
+        self.section_gap = section_gap
+
+    @property
+    def size(self):
+        return self.pagesize or pagesizes.letter
+
+    @property
+    def text_width(self):
+        return self.size[0] - self.left - self.right
+
+    def line_height(self, size):
+        return size + 2
+
+
+DEFAULT_TEMPLATE = PageTemplate()
+
+
+class _Pages:
+    """Tracks the write position on the current page and starts new pages as blocks need them."""
+
+    def __init__(self, pdf, template, title):
+        self.pdf = pdf
+        self.template = template
+        self.title = title
+        self.page = 0
+        self.y = 0
+        width, height = template.size
+        pdf.beginForm("page")
+        pdf.setLineWidth(0.5)
+        pdf.line(template.left, template.bottom - 20, width - template.right, template.bottom - 20)
+        pdf.endForm()
+        pdf.beginForm("continued")
+        pdf.setFont(template.font, 9)
+        pdf.drawString(template.left, height - template.top + 10, title)
+        pdf.endForm()
+        self._start_page()
+
+    def _start_page(self):
+        pdf, template = self.pdf, self.template
+        width, height = template.size
+        if self.page:
+            pdf.showPage()
+        self.page += 1
+        pdf.doForm("page")
+        pdf.setFont(template.font, 9)
+        pdf.drawRightString(width - template.right, template.bottom - 32, f"Page {self.page}")
+        if self.page == 1:
+            pdf.setFont(template.bold_font, template.title_size)
+            pdf.drawCentredString(width / 2, height - template.top, self.title)
+            self.y = height - template.top - 30
+        else:
+            pdf.doForm("continued")
+            self.y = height - template.top - 20
+
+    # Baseline for a block of the given height, on a new page if it does not fit on this one
+    def reserve(self, height, keep_with=0):
+        if self.y - height - keep_with < self.template.bottom and self.y < self.top_of_page():
+            self._start_page()
+        y = self.y
+        self.y -= height
+        return y
+
+    def top_of_page(self):
+        return self.template.size[1] - self.template.top - (30 if self.page == 1 else 20)
+
+
+def _draw_lines(pages, lines, x, font, size, color=None):
+    pdf = pages.pdf
+    for line in lines:
+        y = pages.reserve(pages.template.line_height(size))
+        pdf.setFont(font, size)
+        pdf.setFillColor(color or "black")
+        pdf.drawString(x, y, line)
+
+
+def _draw_block(pages, block):
+    pdf, template = pages.pdf, pages.template
+    kind = block[0]
+    if kind == "heading":
+        if pages.y < pages.top_of_page():
+            pages.y -= template.section_gap
+        y = pages.reserve(template.line_height(template.heading_size),
+                          keep_with=template.line_height(template.body_size))
+        pdf.setFont(template.bold_font, template.heading_size)
+        pdf.setFillColor("black")
+        pdf.drawString(template.left, y, block[1])
+    elif kind == "field":
+        _, label, value, color, size = block
+        size = size or template.body_size
+        label_width = pdf.stringWidth(label, template.bold_font, size) + 10
+        lines = rl_utils.simpleSplit(value, template.font, size, template.text_width - label_width) or [""]
+        y = pages.reserve(template.line_height(size))
+        pdf.setFont(template.bold_font, size)
+        pdf.setFillColor("black")
+        pdf.drawString(template.left, y, label)
+        pdf.setFont(template.font, size)
+        pdf.setFillColor(color or "black")
+        pdf.drawString(template.left + label_width, y, lines[0])
+        _draw_lines(pages, lines[1:], template.left + label_width, template.font, size, color)
+    elif kind == "item":
+        size = template.body_size
+        x = template.left + template.indent
+        bullet_width = pdf.stringWidth("- ", template.font, size)
+        lines = rl_utils.simpleSplit(block[1], template.font, size, template.text_width - template.indent - bullet_width)
+        lines = lines or [""]
+        _draw_lines(pages, ["- " + lines[0]], x, template.font, size)
+        _draw_lines(pages, lines[1:], x + bullet_width, template.font, size)
+    elif kind == "text":
+        _, text, color, size, bold = block
+        size = size or template.body_size
+        font = template.bold_font if bold else template.font
+        _draw_lines(pages, rl_utils.simpleSplit(text, font, size, template.text_width) or [""], template.left, font,
+                    size, color)
+    elif kind == "image":
+        _, data, width, height = block
+        if width > template.text_width:
+            width, height = template.text_width, height * template.text_width / width
+        y = pages.reserve(height + 10)
+        pdf.drawImage(rl_utils.ImageReader(io.BytesIO(data)), template.left, y - height, width=width, height=height)
+    elif kind == "space":
+        pages.y -= block[1]
+    else:
+        raise ValueError(f"Unknown report block {kind!r}")
+
+
+# Lay a report out on as many pages as it needs and write the PDF. output is a filename or a
+# binary file-like object; it is returned once the PDF is complete. timer, if given, is called
+# with the seconds spent rendering, on the thread or process that wrote the PDF.
+def render_report(report, output, template=None, timer=None):
+    start = time.perf_counter()
+    template = template or DEFAULT_TEMPLATE
+    pdf = canvas.Canvas(output, pagesize=template.size)
+    pdf.setTitle(report.title)
+    pages = _Pages(pdf, template, report.title)
+    for block in report.blocks:
+        _draw_block(pages, block)
+    pdf.save()
+    if timer is not None:
+        timer(time.perf_counter() - start)
+    return output
+
+
+def _render_in_worker(args):
+    return render_report(*args)
+
+
+class ReportService:
+    """Renders reports on a pool of background workers.
+
+    Thread workers (the default) let a script carry on while its report is written. With
+    processes=True a large batch is spread over every CPU; outputs must then be filenames.
+    """
+
+    def __init__(self, workers=None, processes=False, template=None):
+        self.workers = workers or ((os.cpu_count() or 1) if processes else 2)
+        self.processes = processes
+        self.template = template
+        # reportlab is loaded here, once, rather than by the first reports rendering side by side
+        preload(canvas, pagesizes, rl_utils)
+        pool = futures.ProcessPoolExecutor if processes else futures.ThreadPoolExecutor
+        self._executor = pool(max_workers=self.workers)
+
+    # Queue one report; returns a concurrent.futures.Future of its output. timer is passed on to
+    # render_report() (it must pickle for process workers).
+    def submit(self, report, output, timer=None):
+        return self._executor.submit(render_report, report, output, self.template, timer)
+
+    # Render (report, output) pairs, handing process workers chunk_size reports at a time;
+    # outputs are returned in order
+    def render_all(self, jobs, chunk_size=None):
+        jobs = [(report, output, self.template) for report, output in jobs]
+        if not self.processes:
+            return list(self._executor.map(_render_in_worker, jobs))
+        chunk_size = chunk_size or max(1, len(jobs) // (self.workers * 4))
+        return list(self._executor.map(_render_in_worker, jobs, chunksize=chunk_size))
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+# The thread-backed service scripts submit their reports to; queued reports finish before the interpreter exits
+def default_service():
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = ReportService()
+        return _default_service
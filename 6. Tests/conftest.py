@@ -0,0 +1,11 @@
+import os
+import sys
+
+# The scripts import their helpers by module name, as they do when run from their own folders
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DYSLEXIA_DIR = os.path.join(ROOT, "2. Dyslexia", "1. Python Script")
+ADHD_DIR = os.path.join(ROOT, "3. ADHD", "1. Python Scripts")
+COMMON_DIR = os.path.join(ROOT, "5. Common")
+for directory in (COMMON_DIR, ADHD_DIR, DYSLEXIA_DIR):
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from column_table import CategoryCodes, ColumnTable, export_npz
+
+SCHEMA = (("score", "<f8"), ("count", "<i4"), ("flag", "?"), ("text", "str"), ("student", "category"))
+
+
+def batch(start, size):
+    return {
+        "score": [i / 3 for i in range(start, start + size)],
+        "count": list(range(start, start + size)),
+        "flag": [i % 2 == 0 for i in range(start, start + size)],
+        "text": ["" if i % 5 == 0 else f"réponse {i} ✓" for i in range(start, start + size)],
+        "student": [None if i % 7 == 0 else f"s{i % 3}" for i in range(start, start + size)],
+    }
+
+
+def test_append_and_read_back(tmp_path):
+    path = str(tmp_path / "table")
+    table = ColumnTable(path, SCHEMA)
+    assert len(table) == 0
+    expected = {name: [] for name, _ in SCHEMA}
+    for start, size in ((0, 10), (10, 1), (11, 40)):
+        table.append(batch(start, size))
+        for name, values in batch(start, size).items():
+            expected[name].extend(values)
+
+    reopened = ColumnTable(path)
+    assert len(reopened) == 51
+    assert reopened.schema == SCHEMA
+    for name, _ in SCHEMA:
+        assert reopened.values(name) == expected[name]
+    assert reopened.values("text", slice(5, 8)) == expected["text"][5:8]
+    assert reopened.values("student", reopened.rows_where("student", "s1")) == ["s1"] * expected["student"].count("s1")
+    assert np.array_equal(reopened.column("count"), np.arange(51))
+
+
+def test_category_codes(tmp_path):
+    table = ColumnTable(str(tmp_path / "keys"), (("key", "category"),))
+    table.append({"key": ["'a'"]})
+    table.append({"key": CategoryCodes([1, -1, 0, 1], ["Button.left", "'a'"])})
+    assert table.values("key") == ["'a'", "'a'", None, "Button.left", "'a'"]
+
+
+def test_interrupted_append_is_discarded(tmp_path):
+    path = str(tmp_path / "table")
+    table = ColumnTable(path, SCHEMA)
+    table.append(batch(0, 5))
+    # A crash after writing column data but before committing the row count
+    with open(tmp_path / "table" / "score.bin", "ab") as file:
+        file.write(b"\x01" * 24)
+    with open(tmp_path / "table" / "text.utf8", "ab") as file:
+        file.write(b"partial")
+    assert ColumnTable(path).values("score") == batch(0, 5)["score"]
+    table.append(batch(5, 2))
+    assert ColumnTable(path).values("text") == batch(0, 7)["text"]
+
+
+def test_rejects_mismatched_input(tmp_path):
+    path = str(tmp_path / "table")
+    table = ColumnTable(path, SCHEMA)
+    with pytest.raises(ValueError):
+        table.append({"score": [1.0]})
+    with pytest.raises(ValueError):
+        table.append(dict(batch(0, 2), count=[1]))
+    with pytest.raises(ValueError):
+        ColumnTable(path, SCHEMA[:2])
+    with pytest.raises(FileNotFoundError):
+        ColumnTable(str(tmp_path / "missing"))
+
+
+def test_export_npz(tmp_path):
+    table = ColumnTable(str(tmp_path / "table"), SCHEMA)
+    table.append(batch(0, 6))
+    export_npz(table, str(tmp_path / "table.npz"))
+    with np.load(tmp_path / "table.npz") as saved:
+        assert saved["text"].tolist() == batch(0, 6)["text"]
+        categories = saved["student.categories"].tolist()
+        assert [categories[code] if code >= 0 else None for code in saved["student"]] == batch(0, 6)["student"]
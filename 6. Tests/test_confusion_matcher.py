@@ -0,0 +1,34 @@
+import random
+from collections import Counter
+
+from confusion_matcher import ConfusionMatcher
+
+
+# Every set whose words all occur in the token, checked with plain substring searches
+def brute_force_score(confusions, token, weight):
+    counts = Counter(frozenset(confusion) for confusion in confusions if confusion)
+    return sum(weight * count for confusion, count in counts.items() if all(word in token for word in confusion))
+
+
+def random_word(rng, alphabet, max_length):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(1, max_length)))
+
+
+def test_score_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(200):
+        confusions = [tuple(random_word(rng, "abcd", 3) for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(1, 8))]
+        matcher = ConfusionMatcher(confusions, weight=4.0)
+        for _ in range(50):
+            token = random_word(rng, "abcde", 12)
+            assert matcher.score(token) == brute_force_score(confusions, token, 4.0)
+
+
+def test_found_words_are_substrings():
+    rng = random.Random(1)
+    confusions = [tuple(random_word(rng, "ab", 4) for _ in range(2)) for _ in range(20)]
+    matcher = ConfusionMatcher(confusions)
+    for _ in range(500):
+        token = random_word(rng, "ab", 15)
+        found = {matcher.words[word_id] for word_id in matcher.find_words(token)}
+        assert found == {word for word in matcher.words if word in token}
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+nltk = pytest.importorskip("nltk")
+try:
+    nltk.data.find("tokenizers/punkt")
+except LookupError:
+    pytest.skip("NLTK's punkt tokenizer data is not installed", allow_module_level=True)
+import Dyslexia  # noqa: E402
+
+WORDS = ("was", "saw", "there", "their", "flour", "flower", "cat", "tac", "teh", "the", "bdpq", "on", "no", "mat")
+
+
+def random_response(rng, sentence_tokens):
+    words = [token if rng.random() < 0.5 else rng.choice(WORDS) for token in sentence_tokens]
+    if rng.random() < 0.3 and words:
+        word = words[0]
+        if len(word) > 1:
+            i = rng.randrange(len(word) - 1)
+            words[0] = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return " ".join(words)
+
+
+# The legacy analysis scores each word against the sentence's first word; rebuild it from the
+# per-rule scores
+def legacy_from_rules(response, sentence):
+    if Dyslexia.is_exact_match(response, sentence):
+        return 0
+    sentence_tokens = list(Dyslexia.tokenize_sentence(sentence))
+    target_word = sentence_tokens[0] if sentence_tokens else None
+    scores = []
+    for word in Dyslexia.tokenize_and_clean_text(response):
+        if [word] == sentence_tokens:
+            scores.append(0)
+            continue
+        score = sum(Dyslexia.token_rule_scores(word, target_word).values())
+        scores.append(score if score else -0.3)
+    return round(sum(scores) / len(scores), 3)
+
+
+def test_rule_scores_match_legacy_analysis():
+    bank = Dyslexia.load_sentence_bank()
+    rng = random.Random(0)
+    for _ in range(2000):
+        index = rng.randrange(len(bank))
+        response = random_response(rng, bank.tokens[index])
+        if not Dyslexia.tokenize_and_clean_text(response):
+            continue
+        assert Dyslexia.legacy_dyslexia_analysis(response, bank[index], show_progress=False) == \
+            legacy_from_rules(response, bank[index])
+
+
+def test_breakdown_adds_up_to_the_aligned_score():
+    bank = Dyslexia.load_sentence_bank()
+    rng = random.Random(1)
+    for _ in range(2000):
+        index = rng.randrange(len(bank))
+        response = random_response(rng, bank.tokens[index])
+        if not Dyslexia.tokenize_and_clean_text(response):
+            continue
+        breakdown = Dyslexia.score_breakdown(response, bank[index])
+        assert breakdown["score"] == Dyslexia.dyslexia_analysis(response, bank[index])
+
+
+def test_response_without_words_is_rejected():
+    for response in ("", "!!!"):
+        with pytest.raises(ValueError):
+            Dyslexia.dyslexia_analysis(response, "The cat sat on the mat.")
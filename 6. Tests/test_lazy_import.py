@@ -0,0 +1,39 @@
+import sys
+import threading
+
+import pytest
+
+from lazy_import import lazy_import, preload
+
+
+def test_module_loads_on_first_access_from_many_threads(tmp_path, monkeypatch):
+    (tmp_path / "slow_module.py").write_text("import time\ntime.sleep(0.05)\nVALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "slow_module", raising=False)
+
+    module = lazy_import("slow_module")
+    assert "slow_module" not in sys.modules
+    start = threading.Barrier(8)
+    results = []
+
+    def read():
+        start.wait()
+        results.append(module.VALUE)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [42] * 8
+    assert sys.modules["slow_module"].VALUE == 42
+
+
+def test_preload_and_missing_module(tmp_path, monkeypatch):
+    (tmp_path / "preloaded_module.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "preloaded_module", raising=False)
+    preload(lazy_import("preloaded_module"))
+    assert "preloaded_module" in sys.modules
+    with pytest.raises(ModuleNotFoundError):
+        lazy_import("no_such_module_anywhere")
@@ -0,0 +1,57 @@
+import importlib.util
+import os
+import random
+
+import pytest
+
+from conftest import ADHD_DIR
+from session_log import RECORD_SIZE, Session, SessionWriter, synthetic_events
+
+
+def write_log(path, events, start_time):
+    with SessionWriter(path, start_time=start_time) as writer:
+        for event in events:
+            writer.write(*event)
+
+
+def test_write_and_read_back(tmp_path):
+    events = list(synthetic_events(5000, random.Random(0)))
+    events.append((events[-1][0] + 1, 3, "Key.a_key_name_longer_than_one_record ✓", 0, 0))
+    path = str(tmp_path / "session.adhdlog")
+    write_log(path, events, events[0][0])
+
+    session = Session(path)
+    assert session.start_time == events[0][0]
+    assert len(session) == len(events)
+    assert list(session.events()) == events
+
+
+def test_partial_record_is_ignored(tmp_path):
+    events = list(synthetic_events(100, random.Random(1)))
+    path = str(tmp_path / "session.adhdlog")
+    write_log(path, events, events[0][0])
+    with open(path, "ab") as file:
+        file.write(b"\0" * (RECORD_SIZE - 3))  # A crash mid-record
+    assert list(Session(path).events()) == events
+
+
+def test_replay_matches_live_analysis(tmp_path):
+    # pynput needs an input backend (e.g. an X display) to import
+    pytest.importorskip("pynput.keyboard", exc_type=ImportError)
+    pytest.importorskip("pynput.mouse", exc_type=ImportError)
+    spec = importlib.util.spec_from_file_location("adhd_under_test", os.path.join(ADHD_DIR, "2. ADHD.py"))
+    adhd = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(adhd)
+
+    events = list(synthetic_events(20000, random.Random(2)))
+    path = str(tmp_path / "session.adhdlog")
+    write_log(path, events, events[0][0])
+    replayed = adhd.replay_session(path, report=False)
+
+    # The same events handed straight to the capture path, as the listeners would
+    adhd.reset_session()
+    for event in events:
+        adhd.handle_event(*event)
+    adhd.detect_fidget_intervals(adhd.detector)
+    adhd.analyze_pointer_kinematics()
+    assert replayed == dict(adhd.detector.snapshot(), **adhd.pointer_features)
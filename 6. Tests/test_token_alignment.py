@@ -0,0 +1,44 @@
+import random
+
+from token_alignment import align_tokens, myers_distance
+
+
+# Plain O(n * m) Levenshtein distance
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+def random_tokens(rng, max_length):
+    return [rng.choice(("the", "cat", "sat", "on", "mat", "tac", "was", "saw")) for _ in range(rng.randint(0, max_length))]
+
+
+def test_myers_distance_matches_levenshtein():
+    rng = random.Random(0)
+    for _ in range(2000):
+        a, b = random_tokens(rng, 12), random_tokens(rng, 12)
+        assert myers_distance(a, b) == levenshtein(a, b)
+
+
+def test_myers_distance_beyond_one_word():
+    # Patterns longer than 64 tokens span several machine words
+    rng = random.Random(1)
+    for _ in range(50):
+        a, b = random_tokens(rng, 150), random_tokens(rng, 150)
+        assert myers_distance(a, b) == levenshtein(a, b)
+
+
+def test_banded_alignment_is_optimal():
+    rng = random.Random(2)
+    for _ in range(1000):
+        response, target = random_tokens(rng, 10), random_tokens(rng, 10)
+        pairs = align_tokens(response, target)
+        assert [i for i, _ in pairs if i is not None] == list(range(len(response)))
+        assert [j for _, j in pairs if j is not None] == list(range(len(target)))
+        cost = sum(1 for i, j in pairs if i is None or j is None or response[i] != target[j])
+        assert cost == levenshtein(response, target)